@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Aggregate cube over board_results: one scan, then any roll-up without touching the boards.
+
+Every played board gives two cells, one per side:
+    dimensions  round × desk × colour × team × gap
+                colour: "white" / "black" / "?" (no colour stored)
+                gap:    own rating − opponent's rating, bucketed ("±0–49", "+100–199", "−200–399", ...)
+    measures    games, points, wins, draws, losses
+Forfeits and boards without a result are left out — they are not games.
+
+    cube = Cube.build(data)
+    cube.rollup("desk", "colour")                       # white/black score by desk
+    cube.rollup("round", where={"colour": "white"})     # draw rate per round (one cell per board)
+    cube.rollup("gap")                                  # upsets by rating gap
+
+Export (python analytics.py --json cube.json, or GET /api/analytics from standings_server.py)
+is flat for the frontend DeskTrends views:
+    {"dimensions": [...], "measures": [...], "teams": {id: name},
+     "cells": [[round, desk, colour, team_id, gap, games, points, wins, draws, losses], ...]}
+
+Usage:
+    python analytics.py [--db db.json] [--json cube.json|-]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from generate_tournament_report import load_db, who_is_black
+from results import parse_result
+
+DIMENSIONS = ("round", "desk", "colour", "team", "gap")
+MEASURES = ("games", "points", "wins", "draws", "losses")
+GAP_BANDS = ((50, "0–49"), (100, "50–99"), (200, "100–199"), (400, "200–399"))
+
+Key = Tuple[Any, ...]
+
+
+def gap_bucket(own: Any, opp: Any) -> str:
+    """Rating difference from one side's point of view; near-equal pairs share "±0–49"."""
+    try:
+        gap = float(own) - float(opp)
+    except (TypeError, ValueError):
+        return "n/a"
+    band = next((label for edge, label in GAP_BANDS if abs(gap) < edge), "400+")
+    if band == "0–49":
+        return "±0–49"
+    return ("+" if gap > 0 else "−") + band
+
+def _gap_order(label: str) -> float:
+    """Sort key for gap labels: −400+ … ±0–49 … +400+, n/a last."""
+    if label == "n/a":
+        return float("inf")
+    if label == "±0–49":
+        return 0.0
+    lo = float(label[1:].split("–")[0].rstrip("+"))
+    return lo if label[0] == "+" else -lo
+
+
+class Cube:
+    """Cells keyed by DIMENSIONS order, each a list of MEASURES."""
+
+    def __init__(self, cells: Dict[Key, List[float]], teams: Optional[Dict[Any, str]] = None):
+        self.cells = cells
+        self.teams = teams or {}
+        self._rollups: Dict[Tuple[Any, ...], Dict[Key, Dict[str, float]]] = {}
+
+    @classmethod
+    def build(cls, data: Dict[str, Any]) -> "Cube":
+        round_no = {r.get("id"): r.get("round_number") for r in data.get("rounds", []) or []}
+        pairings = {p.get("id"): p for p in data.get("pairings", []) or []}
+        rating = {p.get("id"): p.get("rating") for p in data.get("players", []) or []}
+        cells: Dict[Key, List[float]] = {}
+
+        def add(key: Key, pts: float) -> None:
+            c = cells.get(key)
+            if c is None:
+                c = cells[key] = [0, 0.0, 0, 0, 0]
+            c[0] += 1
+            c[1] += pts
+            if pts == 1.0:
+                c[2] += 1
+            elif pts == 0.5:
+                c[3] += 1
+            else:
+                c[4] += 1
+
+        for br in data.get("board_results", []) or []:
+            res = parse_result(br.get("result"))
+            p = pairings.get(br.get("pairing_id"))
+            if res is None or res.forfeit or br.get("forfeit") or p is None or p.get("team_b_id") is None:
+                continue
+            rnd, desk = round_no.get(p.get("round_id")), br.get("desk_number")
+            black = who_is_black(br)
+            colour_a = "black" if black == "A" else "white" if black == "B" else "?"
+            colour_b = "white" if black == "A" else "black" if black == "B" else "?"
+            ra, rb = rating.get(br.get("player_a_id")), rating.get(br.get("player_b_id"))
+            add((rnd, desk, colour_a, p.get("team_a_id"), gap_bucket(ra, rb)), res.a)
+            add((rnd, desk, colour_b, p.get("team_b_id"), gap_bucket(rb, ra)), res.b)
+
+        teams = {t.get("id"): t.get("name", "") for t in data.get("teams", []) or []}
+        return cls(cells, teams)
+
+    def rollup(self, *dims: str, where: Optional[Dict[str, Any]] = None) -> Dict[Key, Dict[str, float]]:
+        """
+        Measures summed over everything but ``dims``; keys are tuples in ``dims`` order.
+        ``where`` keeps cells whose dimension equals a value (or is in a list/set/tuple of values).
+        Results are memoized per (dims, where).
+        """
+        filters = tuple(sorted((where or {}).items(), key=lambda kv: kv[0]))
+        memo_key = (dims, tuple((d, tuple(v) if isinstance(v, (list, set, tuple)) else v) for d, v in filters))
+        if memo_key in self._rollups:
+            return self._rollups[memo_key]
+
+        pos = [DIMENSIONS.index(d) for d in dims]
+        checks = [(DIMENSIONS.index(d), set(v) if isinstance(v, (list, set, tuple)) else {v}) for d, v in filters]
+        acc: Dict[Key, List[float]] = {}
+        for key, m in self.cells.items():
+            if any(key[i] not in allowed for i, allowed in checks):
+                continue
+            k = tuple(key[i] for i in pos)
+            a = acc.get(k)
+            if a is None:
+                acc[k] = list(m)
+            else:
+                for j in range(len(MEASURES)):
+                    a[j] += m[j]
+        out = {k: dict(zip(MEASURES, v)) for k, v in acc.items()}
+        self._rollups[memo_key] = out
+        return out
+
+    def values(self, dim: str) -> List[Any]:
+        i = DIMENSIONS.index(dim)
+        vals = {k[i] for k in self.cells}
+        if dim == "gap":
+            return sorted(vals, key=_gap_order)
+        return sorted(vals, key=lambda v: (v is None, str(type(v)), v if v is not None else 0))
+
+    def to_json(self) -> Dict[str, Any]:
+        cells = [[*k, *m] for k, m in sorted(self.cells.items(), key=lambda kv: tuple(str(x) for x in kv[0]))]
+        return {"dimensions": list(DIMENSIONS), "measures": list(MEASURES), "teams": self.teams, "cells": cells}
+
+# ----------------------------------------------------------------------------------
+# Cross-tabs (shared by the CLI and the report appendix)
+# ----------------------------------------------------------------------------------
+def pct(part: float, whole: float) -> str:
+    return f"{100.0 * part / whole:.0f}%" if whole else "—"
+
+def desk_colour_table(cube: Cube) -> List[List[Any]]:
+    """Desk | games | white score | black score | draws — one row per desk plus the total."""
+    by = cube.rollup("desk", "colour")
+    rows = [["Доска", "Партий", "Белые, %", "Чёрные, %", "Ничьи, %"]]
+    total = {"white": [0, 0.0, 0], "black": [0, 0.0, 0]}
+    for desk in cube.values("desk"):
+        w = by.get((desk, "white"), {})
+        b = by.get((desk, "black"), {})
+        games = w.get("games", 0)
+        if not games and not b.get("games"):
+            continue
+        rows.append([desk, games, pct(w.get("points", 0), games), pct(b.get("points", 0), b.get("games", 0)),
+                     pct(w.get("draws", 0), games)])
+        for c, m in (("white", w), ("black", b)):
+            total[c][0] += m.get("games", 0)
+            total[c][1] += m.get("points", 0)
+            total[c][2] += m.get("draws", 0)
+    tw, tb = total["white"], total["black"]
+    rows.append(["Всего", tw[0], pct(tw[1], tw[0]), pct(tb[1], tb[0]), pct(tw[2], tw[0])])
+    return rows
+
+def round_table(cube: Cube) -> List[List[Any]]:
+    """Round | games | decisive | draws | white score — sides are halved to count boards."""
+    by = cube.rollup("round")
+    white = cube.rollup("round", where={"colour": "white"})
+    rows = [["Тур", "Партий", "Результативных, %", "Ничьи, %", "Белые, %"]]
+    for rnd in cube.values("round"):
+        m = by.get((rnd,), {})
+        boards = m.get("games", 0) / 2
+        if not boards:
+            continue
+        draws = m.get("draws", 0) / 2
+        w = white.get((rnd,), {})
+        rows.append([rnd, f"{boards:g}", pct(boards - draws, boards), pct(draws, boards),
+                     pct(w.get("points", 0), w.get("games", 0))])
+    return rows
+
+def gap_table(cube: Cube) -> Optional[List[List[Any]]]:
+    """Favourite's view per rating-gap bucket (only "+" buckets); None when ratings never differ."""
+    by = cube.rollup("gap")
+    favs = [g for g in cube.values("gap") if g.startswith("+")]
+    if not favs:
+        return None
+    rows = [["Разница рейтинга", "Партий", "Очки фаворита, %", "Ничьи, %", "Поражения фаворита, %"]]
+    for g in favs:
+        m = by[(g,)]
+        rows.append([g, m["games"], pct(m["points"], m["games"]), pct(m["draws"], m["games"]),
+                     pct(m["losses"], m["games"])])
+    return rows
+
+# ----------------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------------
+def _print_table(title: str, rows: Iterable[List[Any]]) -> None:
+    rows = [[str(c) for c in r] for r in rows]
+    widths = [max(len(r[i]) for r in rows) for i in range(len(rows[0]))]
+    print(f"\n{title}")
+    for r in rows:
+        print("  " + "  ".join(c.rjust(w) if i else c.ljust(w) for i, (c, w) in enumerate(zip(r, widths))))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Desk / colour / round analytics over board results.")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--json", metavar="PATH", help="write the cube for the frontend ('-' for stdout)")
+    args = ap.parse_args(argv)
+
+    cube = Cube.build(load_db(args.db))
+    if args.json == "-":
+        print(json.dumps(cube.to_json(), ensure_ascii=False))
+        return 0
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(cube.to_json(), f, ensure_ascii=False)
+        print(f"✅ {len(cube.cells)} cells written to {args.json}")
+    _print_table("Доски и цвет", desk_colour_table(cube))
+    _print_table("По турам", round_table(cube))
+    gaps = gap_table(cube)
+    if gaps:
+        _print_table("Разница рейтинга", gaps)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
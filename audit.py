@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Integrity auditor for db.json — one indexed pass, no ReportLab, cheap enough for every save.
+
+Each problem is a dict:
+    {"severity": "error" | "warning", "code": "...", "message": "...",
+     "collection": "...", "id": "..."}
+
+Errors make the data unusable for a correct report (orphan references, duplicate desks or rounds,
+unknown result strings, players on the wrong team, ...) and stop the PDF builds.
+Warnings are inconsistencies the report can still render around (stored pairing scores
+that disagree with the boards, missing colours, players off their registered desk, ...).
+
+Usage:  python audit.py [db.json] [--json] [--strict]
+        exit code 1 on errors (or on warnings too with --strict)
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from results import parse_result
+
+Issue = Dict[str, Any]
+
+# Fields who_is_black() reads a colour from
+_COLOUR_KEYS = ("a_is_black", "b_is_black", "player_a_color", "player_b_color", "a_color", "b_color", "black_is")
+
+
+class AuditError(Exception):
+    """Raised by check() when the data has errors; ``issues`` holds the full list."""
+
+    def __init__(self, issues: List[Issue]):
+        self.issues = issues
+        errors = [i for i in issues if i["severity"] == "error"]
+        super().__init__(f"{len(errors)} data error(s) in db.json:\n" + format_issues(errors, limit=20))
+
+    def __reduce__(self):
+        # keep the issue list when the error crosses a process-pool boundary
+        return (AuditError, (self.issues,))
+
+
+def audit(data: Dict[str, Any]) -> List[Issue]:
+    issues: List[Issue] = []
+
+    def add(severity: str, code: str, collection: str, rid: Any, message: str) -> None:
+        issues.append({"severity": severity, "code": code, "message": message,
+                       "collection": collection, "id": rid})
+
+    def index(collection: str) -> Dict[Any, Dict[str, Any]]:
+        out: Dict[Any, Dict[str, Any]] = {}
+        for x in data.get(collection, []) or []:
+            rid = x.get("id")
+            if rid is None:
+                add("error", "missing_id", collection, None, f"record without id: {x}")
+            elif rid in out:
+                add("error", "duplicate_id", collection, rid, f"id {rid!r} is used more than once")
+            else:
+                out[rid] = x
+        return out
+
+    teams = index("teams")
+    players = index("players")
+    rounds = index("rounds")
+    pairings = index("pairings")
+    boards = index("board_results")
+
+    # ---- players ----
+    desk_owner: Dict[Tuple[Any, Any], Any] = {}
+    for pid, p in players.items():
+        if p.get("team_id") not in teams:
+            add("error", "orphan_team", "players", pid, f"{p.get('full_name', '')!r}: unknown team_id {p.get('team_id')!r}")
+        key = (p.get("team_id"), p.get("desk_number"))
+        if key in desk_owner:
+            add("error", "duplicate_player_desk", "players", pid,
+                f"{p.get('full_name', '')!r} and player {desk_owner[key]!r} share desk {p.get('desk_number')} of team {p.get('team_id')!r}")
+        else:
+            desk_owner[key] = pid
+
+    # ---- rounds ----
+    round_owner: Dict[Any, Any] = {}
+    for rid, r in rounds.items():
+        n = r.get("round_number")
+        if n in round_owner:
+            add("error", "duplicate_round", "rounds", rid,
+                f"round_number {n} is already used by round {round_owner[n]!r}")
+        else:
+            round_owner[n] = rid
+
+    # ---- pairings ----
+    seen_in_round: Dict[Tuple[Any, Any], Any] = {}
+    for pid, p in pairings.items():
+        if p.get("round_id") not in rounds:
+            add("error", "orphan_round", "pairings", pid, f"unknown round_id {p.get('round_id')!r}")
+        ta, tb = p.get("team_a_id"), p.get("team_b_id")
+        for side, tid in (("team_a_id", ta), ("team_b_id", tb)):
+            if tid is not None and tid not in teams:
+                add("error", "orphan_team", "pairings", pid, f"unknown {side} {tid!r}")
+        if ta is None:
+            add("error", "missing_team", "pairings", pid, "team_a_id is empty")
+        if ta is not None and ta == tb:
+            add("error", "self_pairing", "pairings", pid, f"team {ta!r} is paired with itself")
+        if bool(p.get("is_bye")) != (tb is None):
+            add("warning", "bye_mismatch", "pairings", pid,
+                f"is_bye={bool(p.get('is_bye'))} but team_b_id={tb!r}; the report and the round sheets skip such pairings differently")
+        for tid in (ta, tb):
+            if tid is None:
+                continue
+            key = (p.get("round_id"), tid)
+            if key in seen_in_round:
+                add("error", "double_booked", "pairings", pid,
+                    f"team {tid!r} already plays in pairing {seen_in_round[key]!r} of the same round")
+            else:
+                seen_in_round[key] = pid
+
+    # ---- board results ----
+    sums: Dict[Any, List[float]] = {}
+    desks_seen: Dict[Tuple[Any, Any], Any] = {}
+    for bid, br in boards.items():
+        pairing = pairings.get(br.get("pairing_id"))
+        if pairing is None:
+            add("error", "orphan_pairing", "board_results", bid, f"unknown pairing_id {br.get('pairing_id')!r}")
+        desk = br.get("desk_number")
+        key = (br.get("pairing_id"), desk)
+        if key in desks_seen:
+            add("error", "duplicate_desk", "board_results", bid,
+                f"desk {desk} of pairing {br.get('pairing_id')!r} already has board {desks_seen[key]!r}")
+        else:
+            desks_seen[key] = bid
+
+        res = br.get("result", "")
+        parsed = parse_result(res)
+        pts = (parsed.a, parsed.b) if parsed is not None else None
+        if pts is None and str(res or "").strip():
+            add("error", "unknown_result", "board_results", bid,
+                f"result {res!r} is not understood and would be scored 0–0")
+        if pts is not None:
+            acc = sums.setdefault(br.get("pairing_id"), [0.0, 0.0])
+            acc[0] += pts[0]
+            acc[1] += pts[1]
+
+        if not any(k in br for k in _COLOUR_KEYS):
+            add("warning", "missing_colour", "board_results", bid, "no colour given; TB-Black bonus is not applied")
+
+        for side in ("a", "b"):
+            player_id = br.get(f"player_{side}_id")
+            if player_id is None:
+                continue
+            pl = players.get(player_id)
+            if pl is None:
+                add("error", "orphan_player", "board_results", bid, f"unknown player_{side}_id {player_id!r}")
+                continue
+            if pairing is not None and pl.get("team_id") != pairing.get(f"team_{side}_id"):
+                add("error", "wrong_team", "board_results", bid,
+                    f"{pl.get('full_name', '')!r} (team {pl.get('team_id')!r}) plays for side {side.upper()} "
+                    f"= team {pairing.get(f'team_{side}_id')!r}")
+            if pl.get("desk_number") != desk:
+                add("warning", "wrong_desk", "board_results", bid,
+                    f"{pl.get('full_name', '')!r} is registered on desk {pl.get('desk_number')} but plays desk {desk}")
+
+        if pairing is not None and pairing.get("team_b_id") is None:
+            add("warning", "board_on_bye", "board_results", bid, "board result recorded for a BYE pairing")
+
+    for pid, p in pairings.items():
+        if pid not in sums or "team_a_points" not in p:
+            continue
+        a, b = sums[pid]
+        try:
+            stored = (float(p.get("team_a_points") or 0), float(p.get("team_b_points") or 0))
+        except (TypeError, ValueError):
+            add("error", "bad_score", "pairings", pid, f"non-numeric score {p.get('team_a_points')!r} : {p.get('team_b_points')!r}")
+            continue
+        if stored != (a, b):
+            add("warning", "score_mismatch", "pairings", pid,
+                f"stored score {stored[0]:g} : {stored[1]:g} but boards sum to {a:g} : {b:g}")
+
+    # ---- results snapshots ----
+    for tr in data.get("tournament_results", []) or []:
+        for row in tr.get("team_standings", []) or []:
+            if row.get("team_id") not in teams:
+                add("error", "orphan_team", "tournament_results", tr.get("id"),
+                    f"team_standings references unknown team {row.get('team_id')!r}")
+            fb, fp = row.get("points_from_boards"), row.get("points_from_pairings")
+            if fb is not None and fp is not None and fb != fp:
+                add("warning", "snapshot_mismatch", "tournament_results", tr.get("id"),
+                    f"{row.get('name', '')!r}: points_from_boards {fb} ≠ points_from_pairings {fp}")
+        for row in tr.get("player_standings", []) or []:
+            if row.get("player_id") is not None and row.get("player_id") not in players:
+                add("error", "orphan_player", "tournament_results", tr.get("id"),
+                    f"player_standings references unknown player {row.get('player_id')!r}")
+
+    return issues
+
+
+def has_errors(issues: List[Issue], strict: bool = False) -> bool:
+    return any(i["severity"] == "error" or strict for i in issues)
+
+
+def check(data: Dict[str, Any], strict: bool = False) -> List[Issue]:
+    """Audit and raise AuditError on errors (or on any issue with strict=True); returns the issues."""
+    issues = audit(data)
+    if has_errors(issues, strict):
+        raise AuditError(issues)
+    return issues
+
+
+def format_issues(issues: List[Issue], limit: Optional[int] = None) -> str:
+    lines = [f"[{i['severity']}] {i['code']} {i['collection']}#{i['id']}: {i['message']}"
+             for i in issues[:limit]]
+    if limit is not None and len(issues) > limit:
+        lines.append(f"... and {len(issues) - limit} more")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Validate db.json before building reports.")
+    ap.add_argument("db", nargs="?", default="db.json")
+    ap.add_argument("--json", action="store_true", help="print the issue list as JSON")
+    ap.add_argument("--strict", action="store_true", help="treat warnings as errors")
+    args = ap.parse_args(argv)
+
+    with open(args.db, "r", encoding="utf-8") as f:
+        issues = audit(json.load(f))
+
+    if args.json:
+        print(json.dumps(issues, ensure_ascii=False, indent=2))
+    elif issues:
+        print(format_issues(issues))
+    errors = sum(1 for i in issues if i["severity"] == "error")
+    if not args.json:
+        print(f"{'❌' if has_errors(issues, args.strict) else '✅'} {errors} error(s), {len(issues) - errors} warning(s)")
+    return 1 if has_errors(issues, args.strict) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Batch builder: report + round sheets for many tournaments in a process pool.
+
+Inputs are db files or directories (searched recursively for --pattern, default db.json).
+Every worker process imports the generators once (fonts, styles, logo stay warm) and then
+takes (tournament, kind) jobs, so divisions and past seasons build in parallel.
+
+Output paths are templates, expanded per tournament:
+    {dir}   directory of the db file        {stem}  db file name without extension
+    {name}  name of that directory
+Defaults write next to each db file: {dir}/tournament_report.pdf and {dir}/rounds_sheets.pdf
+
+Usage:
+    python batch_build.py divisions/ seasons/2024/db.json
+    python batch_build.py archive/ --pattern "*.json" --report "out/{stem}_report.pdf" --sheets "out/{stem}_sheets.pdf"
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_REPORT = "{dir}/tournament_report.pdf"
+DEFAULT_SHEETS = "{dir}/rounds_sheets.pdf"
+
+# ----------------------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------------------
+def _warm_worker() -> None:
+    import generate_tournament_report as report
+    import generate_round_sheets  # noqa: F401
+    report.logo_image()
+
+def _build(kind: str, db_path: str, out_path: str) -> Tuple[float, int]:
+    """Build one PDF; returns (seconds, warnings). Raises on failure."""
+    t0 = time.perf_counter()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    if kind == "report":
+        from generate_tournament_report import load_db, render_report
+        issues = render_report(load_db(db_path), out_path)
+    else:
+        from generate_round_sheets import load_db, render_sheets
+        issues = render_sheets(load_db(db_path), out_path)
+    return time.perf_counter() - t0, len(issues)
+
+# ----------------------------------------------------------------------------------
+# Planning
+# ----------------------------------------------------------------------------------
+def find_tournaments(inputs: List[str], pattern: str = "db.json") -> List[Path]:
+    found: List[Path] = []
+    for raw in inputs:
+        p = Path(raw)
+        if p.is_dir():
+            found.extend(sorted(x for x in p.rglob(pattern) if x.is_file()))
+        elif p.is_file():
+            found.append(p)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {raw}")
+    seen = set()
+    out = []
+    for p in found:
+        key = p.resolve()
+        if key not in seen:
+            seen.add(key)
+            out.append(p)
+    return out
+
+def output_path(template: str, db_path: Path) -> str:
+    db_path = db_path.resolve()
+    return os.path.normpath(template.format(dir=str(db_path.parent), stem=db_path.stem, name=db_path.parent.name))
+
+def plan_jobs(dbs: List[Path], kinds: List[str], templates: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    jobs = []
+    owners: Dict[str, str] = {}
+    for db in dbs:
+        for kind in kinds:
+            out = output_path(templates[kind], db)
+            if out in owners:
+                raise ValueError(f"{db} and {owners[out]} would both write {out}; use {{stem}} or {{name}} in the output template")
+            owners[out] = str(db)
+            jobs.append((kind, str(db), out))
+    return jobs
+
+# ----------------------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------------------
+def run(jobs: List[Tuple[str, str, str]], workers: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        futures = {pool.submit(_build, kind, db, out): (kind, db, out) for kind, db, out in jobs}
+        try:
+            for fut in as_completed(futures):
+                kind, db, out = futures[fut]
+                row: Dict[str, Any] = {"kind": kind, "db": db, "out": out}
+                try:
+                    row["seconds"], row["warnings"] = fut.result()
+                    row["ok"] = True
+                # AuditError, bad JSON, SystemExit from a font lookup, a crashed worker, ...
+                except (BrokenProcessPool, SystemExit, Exception) as e:
+                    row["ok"] = False
+                    row["error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                results.append(row)
+                status = "✅" if row["ok"] else "❌"
+                print(f"{status} {kind:<6} {db}" + (f"  {row['seconds']:.2f}s" if row["ok"] else f"  {row['error']}"))
+        except KeyboardInterrupt:
+            # Ctrl-C stops the whole batch: drop the queued jobs instead of building them
+            running = list((pool._processes or {}).values())  # no public way to stop running builds
+            pool.shutdown(wait=False, cancel_futures=True)
+            for proc in running:
+                proc.terminate()
+            raise
+    order = {job: i for i, job in enumerate(jobs)}
+    results.sort(key=lambda r: order[(r["kind"], r["db"], r["out"])])
+    return results
+
+def print_summary(results: List[Dict[str, Any]], wall: float, workers: int) -> None:
+    ok = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+    cpu = sum(r["seconds"] for r in ok)
+    print()
+    print(f"{'Kind':<7}{'Time, s':>9}{'Warn':>6}  Output")
+    for r in results:
+        if r["ok"]:
+            print(f"{r['kind']:<7}{r['seconds']:>9.2f}{r['warnings']:>6}  {r['out']}")
+        else:
+            print(f"{r['kind']:<7}{'FAILED':>9}{'':>6}  {r['db']}: {r['error']}")
+    print(f"\n{len(ok)} built, {len(failed)} failed; {cpu:.2f}s of builds in {wall:.2f}s wall on {workers} worker(s)")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build reports and round sheets for many tournaments in parallel.")
+    ap.add_argument("inputs", nargs="+", help="db files or directories")
+    ap.add_argument("--pattern", default="db.json", help="file glob used inside directories")
+    ap.add_argument("--report", default=DEFAULT_REPORT, help="report output path template")
+    ap.add_argument("--sheets", default=DEFAULT_SHEETS, help="round sheets output path template")
+    ap.add_argument("--only", choices=("report", "sheets"), help="build just one of the two PDFs")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    args = ap.parse_args(argv)
+
+    dbs = find_tournaments(args.inputs, args.pattern)
+    if not dbs:
+        print("No tournament files found.", file=sys.stderr)
+        return 1
+    kinds = [args.only] if args.only else ["report", "sheets"]
+    try:
+        jobs = plan_jobs(dbs, kinds, {"report": args.report, "sheets": args.sheets})
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    workers = max(1, min(args.jobs, len(jobs)))
+    t0 = time.perf_counter()
+    try:
+        results = run(jobs, workers)
+    except KeyboardInterrupt:
+        print("\n❌ interrupted", file=sys.stderr)
+        return 130
+    print_summary(results, time.perf_counter() - t0, workers)
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
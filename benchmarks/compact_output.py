@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+File size and build+write time of the report output variants:
+    default            ASCII85-wrapped Flate streams, 300 dpi colour logo
+    compact            binary Flate streams, 150 dpi logo              (--compact)
+    compact+grayscale  + no fills, black accents, grayscale logo       (--compact --grayscale)
+
+Runs on the real db.json and on a synthetic tournament of about 500 pages
+(70 teams × 70 rounds). Every variant writes a real file; the time is the median of
+--repeat builds in one warm process (fonts and logo already loaded).
+
+Usage:  python benchmarks/compact_output.py [--db db.json] [--teams 70] [--rounds 70] [--repeat 3]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+VARIANTS = (
+    ("default", {}),
+    ("compact", {"compact": True}),
+    ("compact+grayscale", {"compact": True, "grayscale": True}),
+)
+
+
+def measure(report, data, repeat: int, tmpdir: str):
+    rows = []
+    for name, opts in VARIANTS:
+        path = os.path.join(tmpdir, f"{name}.pdf")
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            report.render_report(data, path, **opts)
+            times.append(time.perf_counter() - t0)
+        rows.append((name, os.path.getsize(path), statistics.median(times)))
+    return rows
+
+
+def page_count(path: str) -> int:
+    with open(path, "rb") as f:
+        return f.read().count(b"/Type /Page\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--db", default=os.path.join(os.path.dirname(HERE), "db.json"))
+    ap.add_argument("--teams", type=int, default=70)
+    ap.add_argument("--rounds", type=int, default=70)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    import generate_tournament_report as report
+    from synthetic import make_tournament
+
+    report.logo_image()
+    inputs = [(os.path.basename(args.db), report.load_db(args.db), args.repeat),
+              (f"synthetic {args.teams}×{args.rounds}", make_tournament(teams=args.teams, rounds=args.rounds),
+               max(1, args.repeat // 3))]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, data, repeat in inputs:
+            rows = measure(report, data, repeat, tmpdir)
+            pages = page_count(os.path.join(tmpdir, "default.pdf"))
+            base = rows[0][1]
+            print(f"\n{label}: {pages} pages, median of {repeat} build(s)")
+            print(f"{'variant':<19}{'size, KB':>10}{'vs default':>12}{'build+write, s':>16}")
+            for name, size, secs in rows:
+                print(f"{name:<19}{size / 1024:>10.0f}{size / base:>11.0%}{secs:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Peak-RSS benchmark: regular vs chunked (bounded-memory) report build.
+
+Every (mode, rounds) point runs in a fresh interpreter; the figure reported is the
+peak RSS growth during render_report() over the RSS after imports and data generation.
+On Linux the kernel's peak counter is reset right before the build (/proc/self/clear_refs),
+so setup garbage does not hide the build's own peak; elsewhere ru_maxrss is used as is.
+
+Usage:  python benchmarks/report_memory.py [--teams 40] [--rounds 10 20 40 80]
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import io
+import os
+import resource
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+
+def _status_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def _reset_peak() -> float:
+    """Reset the peak-RSS counter where possible; returns the current RSS in MB."""
+    gc.collect()
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return _status_mb("VmRSS")
+    except OSError:
+        return _peak_mb()
+
+
+def _peak_mb() -> float:
+    try:
+        return _status_mb("VmHWM")
+    except OSError:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def child(mode: str, teams: int, rounds: int) -> None:
+    import generate_tournament_report as report
+    from synthetic import make_tournament
+    data = make_tournament(teams=teams, rounds=rounds)
+    report.logo_image()
+    base = _reset_peak()
+    out = io.BytesIO()
+    t0 = time.perf_counter()
+    report.render_report(data, out, chunked=(mode == "chunked"))
+    print(f"{base:.1f} {_peak_mb():.1f} {time.perf_counter() - t0:.2f} {len(out.getvalue())}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--teams", type=int, default=40)
+    ap.add_argument("--rounds", type=int, nargs="+", default=[10, 20, 40, 80])
+    ap.add_argument("--child", nargs=2, metavar=("MODE", "ROUNDS"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.child[0], args.teams, int(args.child[1]))
+        return
+
+    print(f"{args.teams} teams × 4 desks")
+    print(f"{'rounds':>6} {'mode':>8} {'build, s':>9} {'PDF, KB':>8} {'peak ΔRSS, MB':>14}")
+    for rounds in args.rounds:
+        for mode in ("list", "chunked"):
+            out = subprocess.run([sys.executable, __file__, "--teams", str(args.teams), "--child", mode, str(rounds)],
+                                 check=True, capture_output=True, text=True).stdout.split()
+            base, peak, secs, size = float(out[0]), float(out[1]), float(out[2]), int(out[3])
+            print(f"{rounds:>6} {mode:>8} {secs:>9.2f} {size / 1024:>8.0f} {peak - base:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic db.json generator for the benchmarks (same shape as the real db.json).
+
+Teams play a circle-method round robin (repeated if more rounds than N-1 are asked for),
+results are random but reproducible, and a "live" tournament_results snapshot with
+player standings is attached so every report section has data.
+"""
+
+from __future__ import annotations
+import random
+from typing import Any, Dict, List
+
+FIRST = ["Асет", "Нұрым", "Аида", "Тимур", "Ерсин", "Малика", "Сарвиназ", "Анушервон", "Расима", "Манарбек"]
+LAST = ["Алманбетов", "Сейтқазы", "Оразәлі", "Кужелев", "Нургельдиулы", "Исмагулова", "Зоиров", "Сәлимбаева"]
+
+
+def make_tournament(teams: int = 10, rounds: int = 9, desks: int = 4, seed: int = 1) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    team_rows = [{"id": f"t{i:03d}", "name": f"Команда {i + 1}", "short_code": f"{i + 1:03d}", "notes": "", "players": []}
+                 for i in range(teams)]
+    players: List[Dict[str, Any]] = []
+    for t in team_rows:
+        for d in range(1, desks + 1):
+            players.append({"id": f"{t['id']}d{d}", "full_name": f"{rnd.choice(LAST)} {rnd.choice(FIRST)}",
+                            "team_id": t["id"], "desk_number": d, "rating": 1200})
+
+    ids = [t["id"] for t in team_rows] + ([None] if teams % 2 else [])
+    m = len(ids)
+    round_rows, pairings, boards = [], [], []
+    order = list(ids)
+    for r in range(1, rounds + 1):
+        rid = f"r{r}"
+        round_rows.append({"id": rid, "round_number": r, "is_completed": True})
+        for i in range(m // 2):
+            a, b = order[i], order[m - 1 - i]
+            if a is None or b is None:
+                pairings.append({"id": f"{rid}p{i}", "round_id": rid, "team_a_id": a or b, "team_b_id": None,
+                                 "is_bye": True, "team_a_points": 0, "team_b_points": 0})
+                continue
+            pid = f"{rid}p{i}"
+            sa = sb = 0.0
+            for d in range(1, desks + 1):
+                res = rnd.choice(["1-0", "0-1", "0.5-0.5", "1-0", "0-1"])
+                sa += {"1-0": 1.0, "0-1": 0.0}.get(res, 0.5)
+                sb += {"1-0": 0.0, "0-1": 1.0}.get(res, 0.5)
+                a_white = (d % 2 == 1) == (r % 2 == 1)
+                boards.append({"id": f"{pid}d{d}", "pairing_id": pid, "desk_number": d,
+                               "player_a_id": f"{a}d{d}", "player_b_id": f"{b}d{d}", "result": res,
+                               "player_a_color": "white" if a_white else "black",
+                               "player_b_color": "black" if a_white else "white"})
+            pairings.append({"id": pid, "round_id": rid, "team_a_id": a, "team_b_id": b, "is_bye": False,
+                             "team_a_points": sa, "team_b_points": sb})
+        order = [order[0], order[-1]] + order[1:-1]
+
+    pts: Dict[str, float] = {}
+    for br in boards:
+        a, b = {"1-0": (1.0, 0.0), "0-1": (0.0, 1.0)}.get(br["result"], (0.5, 0.5))
+        pts[br["player_a_id"]] = pts.get(br["player_a_id"], 0.0) + a
+        pts[br["player_b_id"]] = pts.get(br["player_b_id"], 0.0) + b
+    standings = sorted(({"player_id": p["id"], "full_name": p["full_name"], "team_id": p["team_id"],
+                         "desk_number": p["desk_number"], "points": pts.get(p["id"], 0.0),
+                         "wins": 0, "draws": 0, "losses": 0, "tb_desk": pts.get(p["id"], 0.0),
+                         "tb_black": pts.get(p["id"], 0.0)} for p in players),
+                       key=lambda x: -x["points"])
+    results = [{"id": "live", "board_prizes": [], "team_standings": [], "player_standings": standings,
+                "finalized_at": "2025-10-25T10:10:50.595Z"}]
+
+    return {"teams": team_rows, "players": players, "board_results": boards, "rounds": round_rows,
+            "pairings": pairings, "tournament_results": results}
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Diff of two db.json snapshots: what changed and how it moved the team standings.
+
+Both files are indexed by id once, so the comparison is linear in their size:
+    - teams, players, rounds, pairings, board_results, tournament_results: added /
+      removed / changed (changed records list only the fields that differ, old → new;
+      nested values such as team_standings or tb_settings are shown as "changed");
+    - team standings (compute_team_match_standings) on both sides: place and points
+      before and after for every team.
+
+Output: a short text summary, --json for machines, --pdf for a one-page change log with
+signature lines for the arbiters.
+
+Usage:
+    python db_diff.py old/db.json db.json [--json diff.json|-] [--pdf changes.pdf]
+    exit code 0 when nothing changed, 1 when there are differences (as diff(1))
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from generate_tournament_report import (
+    compute_team_match_standings, load_db, pick_latest_results,
+)
+
+COLLECTIONS = ("teams", "players", "rounds", "pairings", "board_results", "tournament_results")
+SECTION_TITLES = {"teams": "Команды", "players": "Игроки", "rounds": "Туры",
+                  "pairings": "Пары", "board_results": "Доски", "tournament_results": "Итоги"}
+MAX_PDF_ROWS = 36   # table rows (standings moves + changes) that fit one readable page;
+MIN_PDF_MOVES = 12  # the JSON always has everything
+
+# ----------------------------------------------------------------------------------
+# Diff
+# ----------------------------------------------------------------------------------
+def diff_collection(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """{"added": [records], "removed": [records], "changed": [{"id", "fields": {f: [old, new]}}]}"""
+    old_by_id = {x.get("id"): x for x in old}
+    new_ids = set()
+    added, changed = [], []
+    for rec in new:
+        rid = rec.get("id")
+        new_ids.add(rid)
+        prev = old_by_id.get(rid)
+        if prev is None:
+            added.append(rec)
+        elif prev != rec:
+            fields = {k: [prev.get(k), rec.get(k)] for k in prev.keys() | rec.keys() if prev.get(k) != rec.get(k)}
+            changed.append({"id": rid, "fields": dict(sorted(fields.items()))})
+    removed = [x for x in old if x.get("id") not in new_ids]
+    return {"added": added, "removed": removed, "changed": changed}
+
+def standings_movement(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per team (new order; removed teams last) with place and points on both sides."""
+    def ranked(data):
+        rows = compute_team_match_standings(pick_latest_results(data.get("tournament_results", []) or []), data)
+        return {r["team_id"]: (i, r) for i, r in enumerate(rows, start=1)}
+
+    before, after = ranked(old), ranked(new)
+    out = []
+    for tid in [*after, *(t for t in before if t not in after)]:
+        b, a = before.get(tid), after.get(tid)
+        out.append({
+            "team_id": tid,
+            "name": (a or b)[1]["name"],
+            "rank_before": b[0] if b else None,
+            "rank_after": a[0] if a else None,
+            "points_before": b[1]["points"] if b else None,
+            "points_after": a[1]["points"] if a else None,
+            "moved": (b[0] - a[0]) if a and b else None,  # + = up
+        })
+    return out
+
+def diff_dbs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    collections = {name: diff_collection(old.get(name, []) or [], new.get(name, []) or [])
+                   for name in COLLECTIONS}
+    return {
+        "summary": {name: {k: len(v) for k, v in d.items()} for name, d in collections.items()},
+        "collections": collections,
+        "standings": standings_movement(old, new),
+    }
+
+def has_changes(diff: Dict[str, Any]) -> bool:
+    """Any record added / removed / changed, or any team that moved in the standings."""
+    if any(n for s in diff["summary"].values() for n in s.values()):
+        return True
+    return any(r["rank_before"] != r["rank_after"] or r["points_before"] != r["points_after"]
+               for r in diff["standings"])
+
+# ----------------------------------------------------------------------------------
+# Human-readable labels
+# ----------------------------------------------------------------------------------
+class Labels:
+    """Names for records of either snapshot (new side wins), e.g. "Тур 3: ГШ – ППС, доска 2"."""
+
+    def __init__(self, old: Dict[str, Any], new: Dict[str, Any]):
+        self.idx: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for name in COLLECTIONS:
+            merged = {x.get("id"): x for x in old.get(name, []) or []}
+            merged.update({x.get("id"): x for x in new.get(name, []) or []})
+            self.idx[name] = merged
+
+    def team(self, tid: Any) -> str:
+        return self.idx["teams"].get(tid, {}).get("name") or ("BYE" if tid is None else str(tid))
+
+    def round(self, rid: Any) -> str:
+        r = self.idx["rounds"].get(rid)
+        return f"Тур {r.get('round_number')}" if r else f"тур {rid}"
+
+    def pairing(self, pid: Any) -> str:
+        p = self.idx["pairings"].get(pid)
+        if not p:
+            return f"пара {pid}"
+        return f"{self.round(p.get('round_id'))}: {self.team(p.get('team_a_id'))} – {self.team(p.get('team_b_id'))}"
+
+    def label(self, collection: str, rec: Dict[str, Any]) -> str:
+        if collection == "teams":
+            return rec.get("name") or str(rec.get("id"))
+        if collection == "players":
+            return f"{(rec.get('full_name') or '').strip()} ({self.team(rec.get('team_id'))}, доска {rec.get('desk_number')})"
+        if collection == "rounds":
+            return f"Тур {rec.get('round_number')}"
+        if collection == "pairings":
+            return self.pairing(rec.get("id"))
+        if collection == "tournament_results":
+            return f"Итоги {rec.get('id')}"
+        return f"{self.pairing(rec.get('pairing_id'))}, доска {rec.get('desk_number')}"
+
+def _fmt(v: Any) -> str:
+    if v is None or v == "":
+        return "—"
+    if isinstance(v, float):
+        return f"{v:g}"
+    return str(v)
+
+def change_lines(diff: Dict[str, Any], labels: Labels) -> List[List[str]]:
+    """[section, record, change] for every added / removed / changed record."""
+    lines = []
+    for name in COLLECTIONS:
+        d = diff["collections"][name]
+        for rec in d["added"]:
+            lines.append([SECTION_TITLES[name], labels.label(name, rec), "добавлено"])
+        for rec in d["removed"]:
+            lines.append([SECTION_TITLES[name], labels.label(name, rec), "удалено"])
+        for ch in d["changed"]:
+            rec = labels.idx[name].get(ch["id"], {"id": ch["id"]})
+            # nested values (standings tables, tb_settings) are too long to print; the JSON has them
+            what = "; ".join(f"{k}: изменено" if isinstance(a, (list, dict)) or isinstance(b, (list, dict))
+                             else f"{k}: {_fmt(a)} → {_fmt(b)}" for k, (a, b) in ch["fields"].items())
+            lines.append([SECTION_TITLES[name], labels.label(name, rec), what])
+    return lines
+
+# ----------------------------------------------------------------------------------
+# One-page PDF change log
+# ----------------------------------------------------------------------------------
+def render_changelog(diff: Dict[str, Any], labels: Labels, out: Any, old_name: str, new_name: str) -> None:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import BaseDocTemplate, Frame, KeepInFrame, PageTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import ParagraphStyle
+    import generate_tournament_report as rep
+
+    rep.register_fonts()
+    doc = BaseDocTemplate(out, pagesize=A4,
+                          leftMargin=rep.LEFT_MARGIN, rightMargin=rep.RIGHT_MARGIN,
+                          topMargin=rep.TOP_MARGIN, bottomMargin=rep.BOTTOM_MARGIN,
+                          title="Журнал изменений", author="Chess Manager")
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - rep.HEADER_RESERVE, id="normal")
+    doc.addPageTemplates([PageTemplate(id="Default", frames=[frame], onPage=rep.header_default)])
+    cell = ParagraphStyle("DiffCell", parent=rep.styles["SmallRU"], fontSize=rep.TABLE_FONT_SIZE,
+                          leading=rep.TABLE_FONT_SIZE + 2)
+
+    story: List[Any] = [
+        Paragraph("Журнал изменений", rep.styles["H2RU"]),
+        Paragraph(f"Было: {escape(old_name)}<br/>Стало: {escape(new_name)}<br/>"
+                  f"Сформировано: {datetime.now().strftime('%d.%m.%Y %H:%M')}", rep.styles["SmallRU"]),
+        Spacer(1, 8),
+    ]
+
+    counts = [["Раздел", "Добавлено", "Удалено", "Изменено"]]
+    for name in COLLECTIONS:
+        s = diff["summary"][name]
+        counts.append([SECTION_TITLES[name], s["added"], s["removed"], s["changed"]])
+    counts_tbl = rep.table_with_style(counts, colWidths=[140, 80, 80, 80], align_body="CENTER")
+    counts_tbl.setStyle(TableStyle([("ALIGN", (0, 1), (0, -1), "LEFT")]))
+    story += [counts_tbl, Spacer(1, 10)]
+
+    moved = [r for r in diff["standings"]
+             if r["rank_before"] != r["rank_after"] or r["points_before"] != r["points_after"]]
+    lines = change_lines(diff, labels)
+    n_moves = min(len(moved), max(MIN_PDF_MOVES, MAX_PDF_ROWS - len(lines)))
+    n_lines = min(len(lines), MAX_PDF_ROWS - n_moves)
+    if n_moves < len(moved):  # keep the biggest jumps, shown in table order
+        keep = sorted(moved, key=lambda r: -abs(r["moved"] or 0))[:n_moves]
+        moved = [r for r in moved if r in keep]
+
+    story.append(Paragraph("Командный зачёт", rep.styles["H3RU"]))
+    if moved:
+        tbl = [["Команда", "Место было", "Место стало", "Очки было", "Очки стало"]]
+        for r in moved:
+            tbl.append([r["name"], _fmt(r["rank_before"]), _fmt(r["rank_after"]),
+                        _fmt(r["points_before"]), _fmt(r["points_after"])])
+        moved_tbl = rep.table_with_style(tbl, colWidths=[180, 75, 75, 75, 75], zebra=True, align_body="CENTER")
+        moved_tbl.setStyle(TableStyle([("ALIGN", (0, 1), (0, -1), "LEFT")]))
+        story.append(moved_tbl)
+        total_moved = sum(1 for r in diff["standings"]
+                          if r["rank_before"] != r["rank_after"] or r["points_before"] != r["points_after"])
+        if total_moved > len(moved):
+            story.append(Paragraph(f"Показаны наибольшие перемещения: {len(moved)} из {total_moved} команд.",
+                                   rep.styles["SmallRU"]))
+    else:
+        story.append(Paragraph("Места и очки команд не изменились.", rep.styles["SmallRU"]))
+    story.append(Spacer(1, 10))
+
+    story.append(Paragraph("Изменения", rep.styles["H3RU"]))
+    if lines:
+        tbl = [["Раздел", "Запись", "Изменение"]]
+        # Paragraph text is markup; names and values are user data ("A&B", "<1>")
+        tbl += [[a, Paragraph(escape(b), cell), Paragraph(escape(c), cell)] for a, b, c in lines[:n_lines]]
+        story.append(rep.table_with_style(tbl, colWidths=[60, 220, rep.FRAME_WIDTH - 280], zebra=True))
+        if len(lines) > n_lines:
+            story.append(Paragraph(f"… и ещё {len(lines) - n_lines} изменений (полный список — в JSON).",
+                                   rep.styles["SmallRU"]))
+    else:
+        story.append(Paragraph("Различий нет.", rep.styles["SmallRU"]))
+    story.append(Spacer(1, 24))
+
+    sign = Table([["Главный судья", "__________________ / __________________ /", "Дата ____________"],
+                  ["Заместитель главного судьи", "__________________ / __________________ /", "Дата ____________"]],
+                 colWidths=[150, 260, rep.FRAME_WIDTH - 410], hAlign="LEFT")
+    sign.setStyle(TableStyle([("FONTNAME", (0, 0), (-1, -1), "RU-Regular"), ("FONTSIZE", (0, 0), (-1, -1), 9),
+                              ("BOTTOMPADDING", (0, 0), (-1, -1), 14)]))
+    story.append(sign)
+
+    # always one page: shrink rather than overflow
+    doc.build([KeepInFrame(frame._width, frame._height - 12, story, mode="shrink")])
+
+# ----------------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------------
+def print_summary(diff: Dict[str, Any], labels: Labels, limit: int = 30) -> None:
+    for name in COLLECTIONS:
+        s = diff["summary"][name]
+        if any(s.values()):
+            print(f"{name:<14} +{s['added']}  -{s['removed']}  ~{s['changed']}")
+    for r in diff["standings"]:
+        if r["moved"]:
+            arrow = "↑" if r["moved"] > 0 else "↓"
+            print(f"  {arrow} {r['name']}: {r['rank_before']} → {r['rank_after']} "
+                  f"({_fmt(r['points_before'])} → {_fmt(r['points_after'])} очк.)")
+    lines = change_lines(diff, labels)
+    for section, rec, what in lines[:limit]:
+        print(f"  [{section}] {rec}: {what}")
+    if len(lines) > limit:
+        print(f"  ... and {len(lines) - limit} more")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Compare two db.json snapshots.")
+    ap.add_argument("old")
+    ap.add_argument("new")
+    ap.add_argument("--json", metavar="PATH", help="write the full diff as JSON ('-' for stdout)")
+    ap.add_argument("--pdf", metavar="PATH", help="write a one-page change log for sign-off")
+    args = ap.parse_args(argv)
+
+    old, new = load_db(args.old), load_db(args.new)
+    diff = diff_dbs(old, new)
+    labels = Labels(old, new)
+
+    if args.json == "-":
+        print(json.dumps(diff, ensure_ascii=False, indent=2))
+    else:
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(diff, f, ensure_ascii=False, indent=2)
+        if has_changes(diff):
+            print_summary(diff, labels)
+        else:
+            print("No differences.")
+    if args.pdf:
+        render_changelog(diff, labels, args.pdf, args.old, args.new)
+        if args.json != "-":
+            print(f"✅ PDF generated: {args.pdf}")
+    return 1 if has_changes(diff) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
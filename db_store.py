@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+db.json read/write helpers for the scripts that modify the data.
+
+save_db() writes a temp file next to the target and os.replace()s it, so readers
+(json-server, the standings server, the PDF scripts) only ever see the old or the
+new file, never a half-written one.
+"""
+
+from __future__ import annotations
+import json
+import os
+import tempfile
+from typing import Any, Dict
+
+
+def load_db(path: str = "db.json") -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_db(data: Dict[str, Any]) -> str:
+    """The layout json-server and the checked-in db.json use (indent 2, no trailing newline)."""
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def save_db(data: Dict[str, Any], path: str = "db.json") -> None:
+    """Atomically replace ``path`` with ``data``."""
+    text = dump_db(data)
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".db-", suffix=".json", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
@@ -16,6 +16,9 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from xml.sax.saxutils import escape
+
+from audit import AuditError, check
 
 
 # --------- Поиск кириллических шрифтов (Windows + локальные варианты) ---------
@@ -60,8 +63,19 @@ def pick_cyrillic_font():
 
 
 REG_PATH, BOLD_PATH = pick_cyrillic_font()
-pdfmetrics.registerFont(TTFont("RU-Regular", REG_PATH))
-pdfmetrics.registerFont(TTFont("RU-Bold", BOLD_PATH))
+RU_FONTS = (TTFont("RU-Regular", REG_PATH), TTFont("RU-Bold", BOLD_PATH))
+
+
+def register_fonts():
+    """Привязывает имена RU-Regular/RU-Bold к шрифтам этого скрипта (отчёт использует те же имена)."""
+    for font in RU_FONTS:
+        if pdfmetrics._fonts.get(font.fontName) is not font:
+            # registerFont() не перезаписывает уже занятое имя — сначала убираем старую привязку
+            pdfmetrics._fonts.pop(font.fontName, None)
+            pdfmetrics.registerFont(font)
+
+
+register_fonts()
 
 styles = getSampleStyleSheet()
 styles.add(ParagraphStyle(name="TitleRU", parent=styles["Title"], fontName="RU-Bold"))
@@ -80,39 +94,103 @@ def idx_by(lst, key="id"):
 
 
 # ========== NEW: Roster page before rounds ==========
-def build_team_rosters(data, story):
-    """Печатает сначала список команд и их 4 игроков (доски 1–4)."""
+ROSTER_COLUMNS = 3      # команд в одном ряду сетки
+ROSTER_GAP_H = 6        # зазор между рядами команд
+ROSTER_DESK_W = 34      # ширина колонки «Доска»
+
+# Имена — абзацы: длинные переносятся внутри своего блока, а не залезают в соседний
+styles.add(ParagraphStyle(name="RosterRU", parent=styles["Normal"], fontName="RU-Regular", fontSize=8, leading=10))
+styles.add(ParagraphStyle(name="RosterBoldRU", parent=styles["RosterRU"], fontName="RU-Bold"))
+
+
+def _roster_block_row(blocks, desks, cols):
+    """Строки одного ряда блоков: название команды, шапка «Доска / Игрок», по строке на доску."""
+    pad = [""] * (2 * (cols - len(blocks)))
+    rows = [
+        sum(([Paragraph(escape(str(name)), styles["RosterBoldRU"]), ""] for name, _ in blocks), []) + pad,
+        ["Доска", "Игрок"] * len(blocks) + pad,
+    ]
+    for d in desks:
+        row = []
+        for _, by_desk in blocks:
+            row += [d, Paragraph(escape(str(by_desk.get(d, "—"))), styles["RosterRU"])]
+        rows.append(row + pad)
+    return rows, len(blocks)
+
+
+def _roster_page_table(block_rows, cols, col_w):
+    """Одна таблица на страницу: ряды блоков «команда + её доски», по cols блоков в ряду."""
+    data, heights, cmds = [], [], [
+        ("FONTNAME", (0, 0), (-1, -1), "RU-Regular"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ("LEFTPADDING", (0, 0), (-1, -1), 3),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 3),
+    ]
+    for i, (rows, n_blocks) in enumerate(block_rows):
+        if i:
+            data.append([""] * (2 * cols))
+            heights.append(ROSTER_GAP_H)
+        top, bottom = len(data), len(data) + len(rows) - 1
+        data += rows
+        heights += [None] * len(rows)
+        for j in range(n_blocks):
+            c0, c1 = 2 * j, 2 * j + 1
+            cmds += [
+                ("SPAN", (c0, top), (c1, top)),
+                ("FONTNAME", (c0, top + 1), (c1, top + 1), "RU-Bold"),
+                ("GRID", (c0, top), (c1, bottom), 0.7, colors.black),
+                ("ALIGN", (c0, top + 1), (c0, bottom), "CENTER"),
+            ]
+    t = Table(data, colWidths=[ROSTER_DESK_W, col_w - ROSTER_DESK_W] * cols, rowHeights=heights, hAlign="LEFT")
+    t.setStyle(TableStyle(cmds))
+    return t
+
+
+def build_team_rosters(data, story, frame_width=547, frame_height=790, cols=ROSTER_COLUMNS):
+    """
+    Составы команд компактной сеткой: по cols команд в ряду, одна таблица на страницу.
+    Число досок берётся из desk_number игроков (не только 1–4).
+    """
     teams = sorted(data.get("teams", []), key=lambda t: t.get("name", ""))
-    # Подготовим индекс игроков по (team_id -> desk_number -> player)
-    players_by_team_and_desk = {}
+    # Один проход по игрокам: team_id -> desk_number -> имя
+    names_by_team = {}
+    desks = set()
     for p in data.get("players", []):
-        players_by_team_and_desk.setdefault(p["team_id"], {})[p.get("desk_number")] = p
+        d = p.get("desk_number")
+        if d is None:
+            continue
+        names_by_team.setdefault(p.get("team_id"), {})[d] = p.get("full_name", "—")
+        desks.add(d)
+    desks = sorted(desks) or [1, 2, 3, 4]
 
     story.append(Paragraph("Составы команд", styles["H2RU"]))
     story.append(Spacer(1, 8))
 
-    for team in teams:
-        story.append(Paragraph(f"<b>{team.get('name','—')}</b>", styles["NormalRU"]))
-        story.append(Spacer(1, 4))
-
-        # Ровно 4 строки: доски 1..4
-        table_data = [["Доска", "Игрок"]]
-        for d in [1, 2, 3, 4]:
-            p = players_by_team_and_desk.get(team["id"], {}).get(d)
-            pname = p.get("full_name") if p else "—"
-            table_data.append([d, pname])
-
-        t = Table(table_data, hAlign="LEFT", colWidths=[36, 382])
-        t.setStyle(TableStyle([
-            ("GRID", (0, 0), (-1, -1), 0.7, colors.black),
-            ("FONTNAME", (0, 0), (-1, 0), "RU-Bold"),
-            ("FONTNAME", (0, 1), (-1, -1), "RU-Regular"),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("ALIGN", (0, 0), (0, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ]))
-        story.append(t)
-        story.append(Spacer(1, 10))
+    # Место на первой странице — за вычетом уже добавленных заголовков
+    used = 0
+    for f in story:
+        used += f.wrap(frame_width, frame_height)[1] + f.getSpaceBefore() + f.getSpaceAfter()
+
+    blocks = [(team.get("name", "—"), names_by_team.get(team.get("id"), {})) for team in teams]
+    col_w = frame_width / cols
+    block_rows = [_roster_block_row(blocks[i:i + cols], desks, cols) for i in range(0, len(blocks), cols)]
+
+    # Высота ряда зависит от переносов в именах — меряем каждый ряд и раскладываем по страницам
+    page, page_h, avail = [], 0.0, frame_height - used
+    for br in block_rows:
+        h = _roster_page_table([br], cols, col_w).wrap(frame_width, frame_height)[1]
+        need = h + (ROSTER_GAP_H if page else 0)
+        if page and page_h + need > avail:
+            story.append(_roster_page_table(page, cols, col_w))
+            story.append(PageBreak())
+            page, page_h, avail, need = [], 0.0, frame_height, h
+        page.append(br)
+        page_h += need
+    if page:
+        story.append(_roster_page_table(page, cols, col_w))
 
     # Отделим составы от туров новой страницей
     story.append(PageBreak())
@@ -206,11 +284,21 @@ def build_round_sheet(round_obj, data, story):
     story.append(PageBreak())
 
 
-def main():
-    data = load_db("db.json")
-
+def render_sheets(data, out, round_numbers=None):
+    """
+    Собирает листы туров по уже загруженным данным в out (путь или бинарный файл).
+    round_numbers — только эти туры (без составов команд); None — все туры и составы.
+    ValueError, если ни одного из запрошенных туров нет (иначе получился бы пустой PDF).
+    Данные сначала проверяются (AuditError при ошибках); возвращает оставшиеся предупреждения.
+    """
+    issues = check(data)
+    if round_numbers is not None:
+        known = {r.get("round_number") for r in data.get("rounds", [])}
+        if not known & set(round_numbers):
+            raise ValueError(f"Туров {', '.join(map(str, sorted(set(round_numbers))))} нет в данных")
+    register_fonts()
     doc = SimpleDocTemplate(
-        "rounds_sheets.pdf",
+        out,
         pagesize=A4,
         leftMargin=18, rightMargin=18, topMargin=20, bottomMargin=20,
         title="Листы туров",
@@ -222,16 +310,37 @@ def main():
     story.append(Spacer(1, 12))
 
     # --- NEW: сначала выводим команды и их 4 игроков ---
-    build_team_rosters(data, story)
+    if round_numbers is None:
+        # полезная область кадра SimpleDocTemplate: поля минус внутренние отступы кадра (6 pt)
+        build_team_rosters(data, story, frame_width=doc.width - 12, frame_height=doc.height - 12)
 
     # --- Далее всё как было: туры и ведомости по парам ---
     rounds = sorted(data.get("rounds", []), key=lambda r: r.get("round_number", 0))
+    if round_numbers is not None:
+        wanted = set(round_numbers)
+        rounds = [r for r in rounds if r.get("round_number") in wanted]
     for rnd in rounds:
         build_round_sheet(rnd, data, story)
 
     doc.build(story)
-    print("✅ PDF сформирован: rounds_sheets.pdf")
+    return issues
+
+
+def main(db_path="db.json", out_path="rounds_sheets.pdf"):
+    data = load_db(db_path)
+    try:
+        issues = render_sheets(data, out_path)
+    except AuditError as e:
+        raise SystemExit(f"❌ {e}")
+    if issues:
+        print(f"⚠ Предупреждений в {db_path}: {len(issues)}; подробности — audit.py")
+    print(f"✅ PDF сформирован: {out_path}")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    ap = argparse.ArgumentParser(description="Листы туров в PDF.")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--out", default="rounds_sheets.pdf")
+    args = ap.parse_args()
+    main(args.db, args.out)
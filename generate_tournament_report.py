@@ -11,8 +11,10 @@ Tournament Report Generator (PDF)
 from __future__ import annotations
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 from reportlab.lib.pagesizes import A4
@@ -21,10 +23,15 @@ from reportlab.platypus import (
     Table, TableStyle, Paragraph, Spacer, FrameBreak, KeepInFrame
 )
 from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+from audit import AuditError, check
+from leaderboard import Leaderboard
+from results import result_points
+
 # ----------------------------------------------------------------------------------
 # Page geometry & constants
 # ----------------------------------------------------------------------------------
@@ -48,6 +55,9 @@ LIGHT_RED = colors.Color(RED.red, RED.green, RED.blue, alpha=0.06)
 
 TEACHER_NAME = "Утегенов Мурат"
 LOGO_REL_PATH = "public/logo.png"
+LOGO_BOX = (260, 80)    # drawn size of the header logo, points
+LOGO_DPI = 300          # the source PNG is ~900 dpi at that size; more is wasted work
+COMPACT_LOGO_DPI = 150  # --compact: still sharp on a 600 dpi laser at 260×80 pt
 
 DEFAULT_DESK_WEIGHT_SCALE = 0.5
 DEFAULT_BLACK_BONUS = 0.10
@@ -91,8 +101,17 @@ def pick_cyrillic_font() -> Tuple[str, str]:
     )
 
 REG_PATH, BOLD_PATH = pick_cyrillic_font()
-pdfmetrics.registerFont(TTFont("RU-Regular", REG_PATH))
-pdfmetrics.registerFont(TTFont("RU-Bold", BOLD_PATH))
+RU_FONTS = (TTFont("RU-Regular", REG_PATH), TTFont("RU-Bold", BOLD_PATH))
+
+def register_fonts() -> None:
+    """Bind RU-Regular/RU-Bold to this script's fonts (round sheets bind the same names)."""
+    for font in RU_FONTS:
+        if pdfmetrics._fonts.get(font.fontName) is not font:
+            # registerFont() ignores names that are already taken, so drop the old binding first
+            pdfmetrics._fonts.pop(font.fontName, None)
+            pdfmetrics.registerFont(font)
+
+register_fonts()
 
 styles = getSampleStyleSheet()
 # Title in Times New Roman Bold, red
@@ -158,6 +177,136 @@ def find_logo_path() -> Optional[str]:
     p = here / LOGO_REL_PATH
     return str(p) if p.exists() else None
 
+@lru_cache(maxsize=4)
+def logo_image(dpi: int = LOGO_DPI, gray: bool = False) -> Optional[ImageReader]:
+    """
+    Decoded logo resampled to ``dpi`` at its drawn size; shared by every page and build in this process.
+    gray=True flattens it onto white as a one-channel image (no alpha mask) for the print variant.
+    """
+    logo_path = find_logo_path()
+    if not logo_path:
+        return None
+    from PIL import Image
+    im = Image.open(logo_path)
+    im.load()
+    scale = min(LOGO_BOX[0] / im.width, LOGO_BOX[1] / im.height) * dpi / 72.0
+    if scale < 1.0:
+        im = im.resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))), Image.LANCZOS)
+    if gray:
+        rgba = im.convert("RGBA")
+        bg = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+        im = Image.alpha_composite(bg, rgba).convert("L")
+    return ImageReader(im)
+
+# ----------------------------------------------------------------------------------
+# Output variants (--compact / --grayscale), switched around one build by output_mode()
+# ----------------------------------------------------------------------------------
+_OUTPUT = {"compact": False, "gray": False}
+
+@contextmanager
+def output_mode(compact: bool = False, grayscale: bool = False):
+    """
+    compact:   binary Flate streams instead of ASCII85-wrapped ones (~25% smaller) and a
+               COMPACT_LOGO_DPI logo. Page compression, TrueType subsetting and image
+               de-duplication are ReportLab defaults and stay on in every mode.
+    grayscale: print variant — black accents, grayscale logo, no header/zebra fills.
+    """
+    from reportlab import rl_config
+    saved_output, saved_a85 = dict(_OUTPUT), rl_config.useA85
+    accented = [st for st in styles.byName.values() if getattr(st, "textColor", None) == RED]
+    _OUTPUT.update(compact=compact, gray=grayscale)
+    if compact:
+        rl_config.useA85 = 0
+    if grayscale:
+        for st in accented:
+            st.textColor = colors.black
+    try:
+        yield
+    finally:
+        _OUTPUT.update(saved_output)
+        rl_config.useA85 = saved_a85
+        for st in accented:
+            st.textColor = RED
+
+def accent_colour():
+    return colors.black if _OUTPUT["gray"] else RED
+
+def header_logo() -> Optional[ImageReader]:
+    return logo_image(COMPACT_LOGO_DPI if _OUTPUT["compact"] else LOGO_DPI, _OUTPUT["gray"])
+
+TABLE_FONT_SIZE = 8.5
+CELL_PAD = 3            # left/right cell padding used by table_with_style
+CELL_PADDING = 2 * CELL_PAD + 1
+
+@lru_cache(maxsize=65536)
+def string_width(text: str, font_name: str, size: float) -> float:
+    """Memoized pdfmetrics.stringWidth; names and numbers repeat across tables and rounds."""
+    return pdfmetrics.stringWidth(text, font_name, size)
+
+def _cell_width(cell: Any, font_name: str, size: float) -> float:
+    return max(string_width(line, font_name, size) for line in str(cell).split("\n"))
+
+def fit_col_widths(rows: List[List[Any]], base_widths: List[float], size: float = TABLE_FONT_SIZE) -> List[float]:
+    """
+    Column widths from measured content (header in RU-Bold, body in RU-Regular).
+
+    The table keeps the overall width of ``base_widths`` (capped at the frame). Body cells are
+    plain strings and never wrap, so every column first gets its widest body cell; headers may
+    break between words (see wrap_header). Slack goes to headers that would otherwise wrap and
+    then to all columns in proportion; if even the body does not fit, the widest columns are
+    capped at one common width so the narrow ones never overflow.
+    """
+    n = len(base_widths)
+    target = min(float(sum(base_widths)), FRAME_WIDTH)
+    body = [0.0] * n
+    for row in rows[1:]:
+        for c, cell in enumerate(row[:n]):
+            w = _cell_width(cell, "RU-Regular", size)
+            if w > body[c]:
+                body[c] = w
+    head_full = [0.0] * n
+    head_word = [0.0] * n
+    for c, cell in enumerate((rows[0] if rows else [])[:n]):
+        head_full[c] = _cell_width(cell, "RU-Bold", size)
+        head_word[c] = max(string_width(w, "RU-Bold", size) for w in (str(cell).split() or [""]))
+
+    full = [max(b, h) + CELL_PADDING for b, h in zip(body, head_full)]
+    need = [max(b, h) + CELL_PADDING for b, h in zip(body, head_word)]
+    if sum(full) <= target:
+        return [w * target / sum(full) for w in full]
+    if sum(need) <= target:
+        slack = target - sum(need)
+        deficit = [f - m for f, m in zip(full, need)]
+        return [m + slack * d / sum(deficit) for m, d in zip(need, deficit)]
+
+    remaining = target
+    cap = max(need)
+    for i, w in enumerate(sorted(need)):
+        share = remaining / (n - i)
+        if w > share:
+            cap = share
+            break
+        remaining -= w
+    return [min(w, cap) for w in need]
+
+def wrap_header(header: List[Any], widths: List[float], size: float = TABLE_FONT_SIZE) -> List[Any]:
+    """Break header labels between words where they are wider than their column."""
+    out = []
+    for cell, width in zip(header, widths):
+        avail = width - CELL_PADDING
+        words = str(cell).split()
+        if not words or string_width(str(cell), "RU-Bold", size) <= avail:
+            out.append(cell)
+            continue
+        lines = [words[0]]
+        for w in words[1:]:
+            if string_width(lines[-1] + " " + w, "RU-Bold", size) <= avail:
+                lines[-1] += " " + w
+            else:
+                lines.append(w)
+        out.append("\n".join(lines))
+    return out + list(header[len(widths):])
+
 def table_with_style(data, colWidths=None, zebra=False, red_header=True, align_body="LEFT"):
     if colWidths is not None:
         try:
@@ -173,17 +322,22 @@ def table_with_style(data, colWidths=None, zebra=False, red_header=True, align_b
         ("GRID", (0,0), (-1,-1), 0.6, colors.black),
         ("FONTNAME", (0,0), (-1,0), "RU-Bold"),
         ("FONTNAME", (0,1), (-1,-1), "RU-Regular"),
-        ("FONTSIZE", (0,0), (-1,-1), 8.5),
+        ("FONTSIZE", (0,0), (-1,-1), TABLE_FONT_SIZE),
+        ("LEFTPADDING", (0,0), (-1,-1), CELL_PAD),
+        ("RIGHTPADDING", (0,0), (-1,-1), CELL_PAD),
         ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
         ("WORDWRAP", (0,0), (-1,-1), True),
         ("ALIGN", (0,0), (-1,0), "CENTER"),
         ("ALIGN", (0,1), (-1,-1), align_body),
     ]
-    if red_header:
+    if _OUTPUT["gray"]:
+        # print variant: no fills, the header row is set off by a heavier rule
+        style += [("LINEBELOW", (0,0), (-1,0), 1.4, colors.black)]
+    elif red_header:
         style += [("BACKGROUND", (0,0), (-1,0), RED), ("TEXTCOLOR", (0,0), (-1,0), colors.white)]
     else:
         style += [("BACKGROUND", (0,0), (-1,0), colors.lightgrey)]
-    if zebra and len(data) > 2:
+    if zebra and len(data) > 2 and not _OUTPUT["gray"]:
         for r in range(1, len(data)):
             if r % 2 == 0:
                 style.append(("BACKGROUND", (0,r), (-1,r), LIGHT_RED))
@@ -203,11 +357,7 @@ def desk_weight(desk: int, max_desk: int, alpha: float) -> float:
     return 1.0 + alpha * (max_desk - desk) / (max_desk - 1)
 
 def parse_result_to_points(res: str) -> Tuple[float, float]:
-    m = (res or "").strip().replace("½", "0.5")
-    if m == "1-0": return 1.0, 0.0
-    if m == "0-1": return 0.0, 1.0
-    if m in ("0.5-0.5","0.5 — 0.5","0.5 - 0.5","0.5–0.5"): return 0.5, 0.5
-    return 0.0, 0.0
+    return result_points(res)  # every notation results.py knows (½-½, 1/2, +/- forfeits, ...)
 
 def who_is_black(br: Dict[str, Any]) -> Optional[str]:
     if "a_is_black" in br: return "A" if br["a_is_black"] else "B"
@@ -221,19 +371,12 @@ def who_is_black(br: Dict[str, Any]) -> Optional[str]:
         return "A" if v == "A" else ("B" if v == "B" else None)
     return None
 
-# ----------------------------------------------------------------------------------
-# NEW: Compute TEAM standings using MATCH points (W=1, D=0.5, L=0)
-# ----------------------------------------------------------------------------------
-def compute_team_match_standings(latest: Optional[Dict[str, Any]], data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    teams = data.get("teams", []) or []
-    pairings = data.get("pairings", []) or []
-    boards = data.get("board_results", []) or []
-    players = data.get("players", []) or []
-
-    teams_by_id = idx_by(teams)
-    players_by_id = idx_by(players)
+# Per-team contribution of one pairing: [match pts, wins, draws, losses, tb_desk, tb_black]
+CONTRIB_FIELDS = ("points", "wins", "draws", "losses", "tb_desk", "tb_black")
 
-    # tb settings
+def match_context(latest: Optional[Dict[str, Any]], data: Dict[str, Any]) -> Tuple[float, float, int, Dict[Any, List[Dict[str, Any]]]]:
+    """(alpha, beta, max_desk, boards by pairing id) — everything pairing_contribution() needs."""
+    boards = data.get("board_results", []) or []
     alpha, beta = get_tb_settings(latest)
 
     # max desk for weights
@@ -248,109 +391,102 @@ def compute_team_match_standings(latest: Optional[Dict[str, Any]], data: Dict[st
     boards_by_pairing: Dict[Any, List[Dict[str, Any]]] = {}
     for br in boards:
         boards_by_pairing.setdefault(br.get("pairing_id"), []).append(br)
+    return alpha, beta, max_desk, boards_by_pairing
 
-    # accumulators
-    match_pts: Dict[Any, float] = {}
-    match_w: Dict[Any, int] = {}
-    match_d: Dict[Any, int] = {}
-    match_l: Dict[Any, int] = {}
-    tb_desk_map: Dict[Any, float] = {}
-    tb_black_map: Dict[Any, float] = {}
+def pairing_contribution(p: Dict[str, Any], pairing_boards: List[Dict[str, Any]],
+                         max_desk: int, alpha: float, beta: float) -> Optional[Dict[Any, List[float]]]:
+    """{team_a_id: [...], team_b_id: [...]} in CONTRIB_FIELDS order; None for byes."""
+    if p.get("is_bye"):
+        # if you later want byes to count as wins, adjust here; for now ignore
+        return None
+    ta = p.get("team_a_id")
+    tb = p.get("team_b_id")
+    if ta is None or tb is None:
+        return None
+
+    ca = [0.0, 0, 0, 0, 0.0, 0.0]
+    cb = [0.0, 0, 0, 0, 0.0, 0.0]
+    a_board = 0.0
+    b_board = 0.0
+
+    for br in sorted(pairing_boards, key=lambda x: x.get("desk_number", 0)):
+        # per-board points
+        a_pts, b_pts = parse_result_to_points(br.get("result", ""))
+        a_board += a_pts
+        b_board += b_pts
+
+        # tb desk/black contributions
+        desk = br.get("desk_number", 1) or 1
+        try: desk = int(desk)
+        except: desk = 1
+        w = desk_weight(desk, max_desk, alpha)
+
+        black_side = who_is_black(br)   # "A" or "B" or None
+        # Desk TB
+        ca[4] += a_pts * w
+        cb[4] += b_pts * w
+        # Black TB
+        ca[5] += a_pts * (1.0 + beta) if black_side == "A" else a_pts
+        cb[5] += b_pts * (1.0 + beta) if black_side == "B" else b_pts
+
+    # award match points
+    if a_board > b_board:
+        ca[0], ca[1], cb[3] = 1.0, 1, 1
+    elif a_board < b_board:
+        cb[0], cb[1], ca[3] = 1.0, 1, 1
+    else:
+        ca[0], cb[0], ca[2], cb[2] = 0.5, 0.5, 1, 1
+    return {ta: ca, tb: cb}
+
+def standings_sort_key(r: Dict[str, Any]) -> Tuple[Any, ...]:
+    # Points ↓, TB-Desk ↓, TB-Black ↓, Wins ↓, Name ↑ (as in methodology);
+    # tie-breaks are compared rounded, so equal sums added in another order stay equal
+    return (
+        -r.get("points", 0.0),
+        -round(r.get("tb_desk", 0.0), 9),
+        -round(r.get("tb_black", 0.0), 9),
+        -r.get("wdl", {}).get("wins", 0),
+        r.get("name", ""),
+    )
 
-    def inc(dct, k, v):
-        dct[k] = dct.get(k, 0) + v
+# ----------------------------------------------------------------------------------
+# NEW: Compute TEAM standings using MATCH points (W=1, D=0.5, L=0)
+# ----------------------------------------------------------------------------------
+def compute_team_match_standings(latest: Optional[Dict[str, Any]], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    teams = data.get("teams", []) or []
+    pairings = data.get("pairings", []) or []
+    alpha, beta, max_desk, boards_by_pairing = match_context(latest, data)
 
     # per pairing compute board totals → award match points
+    totals: Dict[Any, List[float]] = {}
     for p in pairings:
-        if p.get("is_bye"):
-            # if you later want byes to count as wins, adjust here; for now ignore
-            continue
-        ta = p.get("team_a_id")
-        tb = p.get("team_b_id")
-        if ta is None or tb is None:
+        contrib = pairing_contribution(p, boards_by_pairing.get(p.get("id"), []), max_desk, alpha, beta)
+        if contrib is None:
             continue
-
-        a_board = 0.0
-        b_board = 0.0
-
-        for br in sorted(boards_by_pairing.get(p.get("id"), []), key=lambda x: x.get("desk_number", 0)):
-            # per-board points
-            a_pts, b_pts = parse_result_to_points(br.get("result", ""))
-            a_board += a_pts
-            b_board += b_pts
-
-            # tb desk/black contributions
-            desk = br.get("desk_number", 1) or 1
-            try: desk = int(desk)
-            except: desk = 1
-            w = desk_weight(desk, max_desk, alpha)
-
-            black_side = who_is_black(br)   # "A" or "B" or None
-            # Desk TB
-            inc(tb_desk_map, ta, a_pts * w)
-            inc(tb_desk_map, tb, b_pts * w)
-            # Black TB
-            if black_side == "A":
-                inc(tb_black_map, ta, a_pts * (1.0 + beta))
-                inc(tb_black_map, tb, b_pts)
-            elif black_side == "B":
-                inc(tb_black_map, tb, b_pts * (1.0 + beta))
-                inc(tb_black_map, ta, a_pts)
-            else:
-                inc(tb_black_map, ta, a_pts)
-                inc(tb_black_map, tb, b_pts)
-
-        # award match points
-        if a_board > b_board:
-            inc(match_pts, ta, 1.0)
-            inc(match_w, ta, 1)
-            inc(match_l, tb, 1)
-            inc(match_pts, tb, 0.0)
-        elif a_board < b_board:
-            inc(match_pts, tb, 1.0)
-            inc(match_w, tb, 1)
-            inc(match_l, ta, 1)
-            inc(match_pts, ta, 0.0)
-        else:
-            inc(match_pts, ta, 0.5)
-            inc(match_pts, tb, 0.5)
-            inc(match_d, ta, 1)
-            inc(match_d, tb, 1)
+        for tid, c in contrib.items():
+            acc = totals.setdefault(tid, [0.0, 0, 0, 0, 0.0, 0.0])
+            for i, v in enumerate(c):
+                acc[i] += v
 
     # build rows for all teams (even if 0 values)
     rows: List[Dict[str, Any]] = []
     for t in teams:
         tid = t.get("id")
+        pts, wins, draws, losses, tb_desk, tb_black = totals.get(tid, (0.0, 0, 0, 0, 0.0, 0.0))
         rows.append({
             "team_id": tid,
             "name": t.get("name", ""),
-            "points": float(match_pts.get(tid, 0.0)),  # MATCH points for standings
+            "points": float(pts),  # MATCH points for standings
             "wdl": {
-                "wins": int(match_w.get(tid, 0)),
-                "draws": int(match_d.get(tid, 0)),
-                "losses": int(match_l.get(tid, 0)),
+                "wins": int(wins),
+                "draws": int(draws),
+                "losses": int(losses),
             },
-            "tb_desk": float(tb_desk_map.get(tid, 0.0)),
-            "tb_black": float(tb_black_map.get(tid, 0.0)),
+            "tb_desk": float(tb_desk),
+            "tb_black": float(tb_black),
         })
 
-    # Sort: Points ↓, TB-Desk ↓, TB-Black ↓, Wins ↓, Name ↑ (as in methodology)
-    def keyf(r):
-        return (
-            r.get("points", 0.0),
-            r.get("tb_desk", 0.0),
-            r.get("tb_black", 0.0),
-            r.get("wdl", {}).get("wins", 0),
-            # name ascending; for descending numeric we invert later
-        )
-
-    rows.sort(key=lambda r: (
-        -r.get("points", 0.0),
-        -r.get("tb_desk", 0.0),
-        -r.get("tb_black", 0.0),
-        -r.get("wdl", {}).get("wins", 0),
-        r.get("name", ""),
-    ))
+    rows.sort(key=standings_sort_key)
     return rows
 
 # ----------------------------------------------------------------------------------
@@ -368,12 +504,11 @@ def draw_header(canvas, doc, *, show_logo=True, show_line=True):
     frame_top_y = doc.bottomMargin + doc.height - HEADER_RESERVE  # top of main frame area
 
     if show_logo:
-        logo_path = find_logo_path()
-        if logo_path:
-            target_w = 260
-            target_h = 80
+        logo = header_logo()
+        if logo:
+            target_w, target_h = LOGO_BOX
             canvas.drawImage(
-                logo_path,
+                logo,
                 left,
                 frame_top_y + 8,  # sits above the line
                 width=target_w,
@@ -383,7 +518,7 @@ def draw_header(canvas, doc, *, show_logo=True, show_line=True):
             )
 
     if show_line:
-        canvas.setStrokeColor(RED)
+        canvas.setStrokeColor(accent_colour())
         canvas.setLineWidth(1.6)
         canvas.line(left, frame_top_y, right, frame_top_y)
 
@@ -506,7 +641,70 @@ def add_team_standings_page(flow, latest, data):
             wdl.get("wins",0), wdl.get("draws",0), wdl.get("losses",0),
             f"{float(row.get('tb_desk',0.0)):.2f}", f"{float(row.get('tb_black',0.0)):.2f}",
         ])
-    flow.append(table_with_style(tbl, colWidths=[45, 180, 50, 50, 50, 55, 60, 60], zebra=True))
+    widths = fit_col_widths(tbl, [45, 180, 50, 50, 50, 55, 60, 60])
+    tbl[0] = wrap_header(tbl[0], widths)
+    flow.append(table_with_style(tbl, colWidths=widths, zebra=True))
+    flow.append(NextPageTemplate("Default"))
+
+def add_progression_page(flow, latest, data):
+    from progression import compute_progression
+    prog = compute_progression(latest, data)
+    if not prog["rounds"] or not prog["teams"]:
+        return
+    flow.append(PageBreak())
+    flow.append(Paragraph("Динамика мест по турам", styles["H2RU"]))
+    flow.append(NextPageTemplate("NoLogo"))
+    flow.append(Spacer(1, CONTENT_TOP_SPACER))
+
+    tbl = [["Команда", *[f"Тур {n}" for n in prog["rounds"]], "Очки"]]
+    moves = []  # (col, row, up?) for places that changed since the previous round
+    for ri, t in enumerate(prog["teams"], start=1):
+        ranks = [r["rank"] for r in t["rounds"]]
+        tbl.append([t["name"], *ranks, f"{t['rounds'][-1]['points']:.1f}"])
+        for ci in range(1, len(ranks)):
+            if ranks[ci] != ranks[ci - 1]:
+                moves.append((ci + 1, ri, ranks[ci] < ranks[ci - 1]))
+    n = len(prog["rounds"])
+    widths = fit_col_widths(tbl, [150] + [36] * n + [45])
+    tbl[0] = wrap_header(tbl[0], widths)
+    t = table_with_style(tbl, colWidths=widths, zebra=True, align_body="CENTER")
+    if _OUTPUT["gray"]:  # print variant: rises in bold instead of green/red
+        marks = [("FONTNAME", (c, r), (c, r), "RU-Bold") for c, r, up in moves if up]
+    else:
+        marks = [("TEXTCOLOR", (c, r), (c, r), colors.green if up else RED) for c, r, up in moves]
+    t.setStyle(TableStyle([("ALIGN", (0, 1), (0, -1), "LEFT")] + marks))
+    flow.append(t)
+    flow.append(Spacer(1, 6))
+    legend = ("Жирным — подъём по сравнению с предыдущим туром." if _OUTPUT["gray"] else
+              "Зелёным — подъём, красным — спуск по сравнению с предыдущим туром.")
+    flow.append(Paragraph("Место команды после каждого тура (по очкам, TB-Desk, TB-Black, победам). " + legend,
+                          styles["NormalRU"]))
+    flow.append(NextPageTemplate("Default"))
+
+def add_analytics_page(flow, latest, data):
+    """Appendix: desk × colour, per-round and rating-gap cross-tabs from the analytics cube."""
+    from analytics import Cube, desk_colour_table, gap_table, round_table
+    cube = Cube.build(data)
+    if not cube.cells:
+        return
+    flow.append(PageBreak())
+    flow.append(Paragraph("Приложение. Статистика партий", styles["H2RU"]))
+    flow.append(NextPageTemplate("NoLogo"))
+    flow.append(Spacer(1, CONTENT_TOP_SPACER))
+
+    tables = [("Доски и цвет фигур", desk_colour_table(cube), [70, 70, 80, 80, 80]),
+              ("По турам", round_table(cube), [70, 70, 110, 80, 80])]
+    gaps = gap_table(cube)
+    if gaps:
+        tables.append(("Разница рейтинга (с точки зрения фаворита)", gaps, [110, 60, 100, 70, 130]))
+    for title, tbl, base in tables:
+        widths = fit_col_widths(tbl, base)
+        tbl[0] = wrap_header(tbl[0], widths)
+        flow.append(Paragraph(title, styles["H3RU"]))
+        flow.append(table_with_style(tbl, colWidths=widths, zebra=True, align_body="CENTER"))
+        flow.append(Spacer(1, 10))
+    flow.append(Paragraph("Учтены сыгранные партии; неявки и доски без результата не входят. "
+                          "Проценты — доля набранных очков или исходов от числа партий.", styles["SmallRU"]))
     flow.append(NextPageTemplate("Default"))
 
 def add_player_standings_section(flow, latest, data):
@@ -534,7 +732,9 @@ def add_player_standings_section(flow, latest, data):
         ])
 
     flow.append(NextPageTemplate("NoLogo"))
-    flow.append(table_with_style(tbl, colWidths=[45,160,140,45,45,30,30,30,55,55], zebra=True))
+    widths = fit_col_widths(tbl, [45,160,140,45,45,30,30,30,55,55])
+    tbl[0] = wrap_header(tbl[0], widths)
+    flow.append(table_with_style(tbl, colWidths=widths, zebra=True))
     flow.append(NextPageTemplate("Default"))
 
 def add_board_prizes_page(flow, latest, data):
@@ -547,12 +747,7 @@ def add_board_prizes_page(flow, latest, data):
     bp = latest.get("board_prizes", []) if latest else []
     ps = latest.get("player_standings", []) if latest else []
 
-    def derive_by_desk(desk_num: int) -> List[Dict[str, Any]]:
-        rows = [r for r in ps if r.get("desk_number")==desk_num]
-        def keyf(r):
-            return (float(r.get("points",0)), float(r.get("tb_desk",0)), float(r.get("tb_black",0)))
-        rows.sort(key=keyf, reverse=True)
-        return rows[:2]
+    board = Leaderboard(ps)
 
     prizes_map: Dict[int, Dict[str, Any]] = {}
     for item in bp:
@@ -560,14 +755,14 @@ def add_board_prizes_page(flow, latest, data):
         if d is None: continue
         prizes_map.setdefault(d, {}).update(item)
 
-    all_desks = set(prizes_map.keys()) | set([r.get("desk_number") for r in ps if r.get("desk_number") is not None])
+    all_desks = set(prizes_map.keys()) | set(board.values("desk"))
     rows = [["Доска","Победитель","Команда","Очки","2 место","Команда","Очки"]]
     proof_header = ["Доска","Игрок","Команда","Очки","TB-Desk","TB-Black"]
     proof_rows = [proof_header]
 
     for d in sorted(all_desks):
         prize = prizes_map.get(d, {})
-        top_two = derive_by_desk(d)
+        top_two = board.top("desk", d, 2)
         if prize.get("full_name"):
             win_name = prize.get("full_name")
             win_team = teams_by_id.get(prize.get("team_id"),{}).get("name","")
@@ -592,29 +787,36 @@ def add_board_prizes_page(flow, latest, data):
         rows.append([d, win_name, win_team, win_pts, ru_name, ru_team, ru_pts])
 
         for person in [win_name, ru_name]:
-            cand = next((x for x in ps if x.get("full_name")==person and x.get("desk_number")==d), None)
+            cand = board.find(person, d)
             if cand:
                 proof_rows.append([
                     d, person, teams_by_id.get(cand.get("team_id"),{}).get("name",""),
                     cand.get("points",""), cand.get("tb_desk",""), cand.get("tb_black",""),
                 ])
 
-    flow.append(table_with_style(rows, zebra=True, colWidths=[45,130,140,50,130,140,50]))
+    widths = fit_col_widths(rows, [45,130,140,50,130,140,50])
+    rows[0] = wrap_header(rows[0], widths)
+    flow.append(table_with_style(rows, zebra=True, colWidths=widths))
     flow.append(Spacer(1, 8))
     flow.append(Paragraph("Детализация по призёрам (пер-досочные тай-брейки)", styles["H3RU"]))
-    flow.append(table_with_style(proof_rows, zebra=True, colWidths=[45,150,160,50,60,60], align_body="CENTER"))
+    widths = fit_col_widths(proof_rows, [45,150,160,50,60,60])
+    proof_rows[0] = wrap_header(proof_rows[0], widths)
+    flow.append(table_with_style(proof_rows, zebra=True, colWidths=widths, align_body="CENTER"))
     flow.append(NextPageTemplate("Default"))
 
-def add_round_pages(flow, latest, data):
+def iter_round_pages(latest, data) -> Iterator[List[Any]]:
     """
     Rounds: NO logo and NO red line. Each round starts on a fresh page and
-    content begins at the very top (normal top margin).
+    content begins at the very top (normal top margin). Yields one flowable list per round.
     """
     players_by_id = idx_by(data.get("players", []))
     teams_by_id   = idx_by(data.get("teams", []))
     rounds  = sorted(data.get("rounds", []), key=lambda x: x.get("round_number", 0))
     pairings= data.get("pairings", [])
     boards  = data.get("board_results", [])
+    pairings_by_round = {}
+    for p in pairings:
+        pairings_by_round.setdefault(p.get("round_id"), []).append(p)
     boards_by_pairing = {}
     for br in boards:
         boards_by_pairing.setdefault(br.get("pairing_id"), []).append(br)
@@ -628,16 +830,27 @@ def add_round_pages(flow, latest, data):
         except: d = 1
         if d > max_desk: max_desk = d
 
+    # One layout for every board table: measured over all names and result strings up front
+    header = ["Доска","A (игрок)","B (игрок)","Результат","Очки A","Очки B","W(d)","TB-Desk A","TB-Desk B","Чёрные"]
+    sample = [header, ["","","","Итого:","","","","","",""]]
+    sample += [[max_desk, p.get("full_name","—"), p.get("full_name","—"), "", "0.00", "0.00", "0.000", "0.000", "0.000", "—"]
+               for p in data.get("players", [])]
+    sample += [["", "", "", res] for res in {br.get("result","") for br in boards}]
+    round_widths = fit_col_widths(sample, [40,150,150,55,45,45,45,55,55,45])
+    header = wrap_header(header, round_widths)
+
     for rnd in rounds:
+        flow: List[Any] = []
         flow.append(NextPageTemplate("NoHeaderFull"))
         flow.append(PageBreak())
 
         flow.append(Paragraph(f"Тур {rnd.get('round_number','')}", styles["H2RU"]))
         flow.append(Spacer(1, 4))
 
-        rnd_pairings = [p for p in pairings if p.get("round_id")==rnd.get("id")]
+        rnd_pairings = pairings_by_round.get(rnd.get("id"), [])
         if not rnd_pairings:
             flow.append(Paragraph("Нет пар для этого тура.", styles["SmallRU"]))
+            yield flow
             continue
 
         for p in rnd_pairings:
@@ -659,7 +872,6 @@ def add_round_pages(flow, latest, data):
                 flow.append(Spacer(1, 8))
                 continue
 
-            header = ["Доска","A (игрок)","B (игрок)","Результат","Очки A","Очки B","W(d)","TB-Desk A","TB-Desk B","Чёрные"]
             rows = [header]
             sum_a = 0.0
             sum_b = 0.0
@@ -680,13 +892,92 @@ def add_round_pages(flow, latest, data):
                 ])
 
             rows.append(["","","","Итого:", f"{sum_a:.2f}", f"{sum_b:.2f}","","","",""])
-            flow.append(table_with_style(rows, zebra=True, colWidths=[40,150,150,55,45,45,45,55,55,45], align_body="CENTER"))
+            flow.append(table_with_style(rows, zebra=True, colWidths=round_widths, align_body="CENTER"))
             flow.append(Spacer(1, 10))
+        yield flow
 
+def add_round_pages(flow, latest, data):
+    for chunk in iter_round_pages(latest, data):
+        flow.extend(chunk)
     flow.append(NextPageTemplate("Default"))
 
-def build_pdf():
-    data = load_db("db.json")
+# ----------------------------------------------------------------------------------
+# Bounded-memory build: flowables are produced chunk by chunk while the doc lays them out
+# ----------------------------------------------------------------------------------
+class FlowableStream(list):
+    """
+    The list handed to doc.build(), refilled from an iterator of flowable chunks as
+    ReportLab consumes it from the front. Laid-out flowables are deleted by the build
+    loop, so only the chunks in flight (plus ``lookahead`` items) are ever alive.
+    """
+
+    def __init__(self, chunks: Iterable[List[Any]], lookahead: int = 8):
+        super().__init__()
+        self._chunks: Optional[Iterator[List[Any]]] = iter(chunks)
+        self._lookahead = lookahead
+        self._fill(lookahead)
+
+    def _fill(self, need: int) -> None:
+        while self._chunks is not None and list.__len__(self) < need:
+            try:
+                self.extend(next(self._chunks))
+            except StopIteration:
+                self._chunks = None
+
+    def __len__(self) -> int:
+        self._fill(self._lookahead)
+        return list.__len__(self)
+
+    def __getitem__(self, i):
+        if isinstance(i, int) and i >= 0:
+            # keepWithNext / breakBefore handling peeks a few items ahead
+            self._fill(i + 1 + self._lookahead)
+        return list.__getitem__(self, i)
+
+def report_chunks(latest, data, progression: bool = False, analytics: bool = False) -> Iterator[List[Any]]:
+    """The report body in layout order: one chunk per section, then one per round."""
+    # Page 1 uses "First" (logo + line, bottom footer), then switch to Default
+    flow: List[Any] = [NextPageTemplate("First")]
+    add_title_page(flow, latest)
+    flow.append(NextPageTemplate("Default"))
+    yield flow
+
+    sections = [add_methodology_page, add_team_standings_page,
+                add_player_standings_section, add_board_prizes_page]
+    if progression:
+        sections.insert(2, add_progression_page)
+    for section in sections:
+        flow = []
+        section(flow, latest, data)
+        yield flow
+
+    yield from iter_round_pages(latest, data)
+    yield [NextPageTemplate("Default")]
+
+    if analytics:
+        flow = []
+        add_analytics_page(flow, latest, data)
+        yield flow
+
+def render_report(data: Dict[str, Any], out: Any, chunked: bool = False,
+                  progression: bool = False, compact: bool = False, grayscale: bool = False,
+                  analytics: bool = False) -> List[Dict[str, Any]]:
+    """
+    Lay out the full report for already-loaded ``data`` into ``out`` (path or binary file).
+    The data is audited first (AuditError on errors); returns the remaining warnings.
+    chunked=True builds flowables section by section / round by round while the document
+    is laid out, so peak memory no longer grows with the number of rounds.
+    progression=True adds the place-after-every-round page after the team standings,
+    analytics=True an appendix with desk/colour/round statistics after the rounds.
+    compact / grayscale select the emailed and printed variants (see output_mode).
+    """
+    issues = check(data)
+    with output_mode(compact, grayscale):
+        _layout_report(data, out, chunked, progression, analytics)
+    return issues
+
+def _layout_report(data: Dict[str, Any], out: Any, chunked: bool, progression: bool, analytics: bool) -> None:
+    register_fonts()
     tr_list = data.get("tournament_results", [])
     latest = pick_latest_results(tr_list)
     if latest is not None and "tb_settings" not in latest:
@@ -697,7 +988,7 @@ def build_pdf():
 
     from reportlab.platypus import Frame
     doc = BaseDocTemplate(
-        "tournament_report.pdf",
+        out,
         pagesize=A4,
         leftMargin=LEFT_MARGIN, rightMargin=RIGHT_MARGIN,
         topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN,
@@ -745,20 +1036,42 @@ def build_pdf():
     ]
     doc.addPageTemplates(templates)
 
-    flow: List[Any] = []
-    # Page 1 uses "First" (logo + line, bottom footer), then switch to Default
-    flow.append(NextPageTemplate("First"))
-    add_title_page(flow, latest)
-    flow.append(NextPageTemplate("Default"))
-
-    add_methodology_page(flow, latest, data)
-    add_team_standings_page(flow, latest, data)
-    add_player_standings_section(flow, latest, data)
-    add_board_prizes_page(flow, latest, data)
-    add_round_pages(flow, latest, data)
-
-    doc.build(flow)
-    print("✅ PDF generated: tournament_report.pdf")
+    if chunked:
+        doc.build(FlowableStream(report_chunks(latest, data, progression, analytics)))
+    else:
+        flow: List[Any] = []
+        for chunk in report_chunks(latest, data, progression, analytics):
+            flow.extend(chunk)
+        doc.build(flow)
+
+def build_pdf(db_path: str = "db.json", out_path: str = "tournament_report.pdf", chunked: bool = False,
+              progression: bool = False, compact: bool = False, grayscale: bool = False,
+              analytics: bool = False):
+    data = load_db(db_path)
+    try:
+        issues = render_report(data, out_path, chunked=chunked, progression=progression,
+                               compact=compact, grayscale=grayscale, analytics=analytics)
+    except AuditError as e:
+        raise SystemExit(f"❌ {e}")
+    if issues:
+        print(f"⚠ {len(issues)} warning(s) in {db_path}; run audit.py for details")
+    print(f"✅ PDF generated: {out_path}")
 
 if __name__ == "__main__":
-    build_pdf()
+    import argparse
+    ap = argparse.ArgumentParser(description="Build the tournament report PDF.")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--out", default="tournament_report.pdf")
+    ap.add_argument("--chunked", action="store_true",
+                    help="bounded-memory build for very large tournaments (same output)")
+    ap.add_argument("--progression", action="store_true",
+                    help="add a page with every team's place after each round")
+    ap.add_argument("--compact", action="store_true",
+                    help="smaller file for email: binary streams, lighter logo")
+    ap.add_argument("--grayscale", action="store_true",
+                    help="print variant: no colour fills, black accents, grayscale logo")
+    ap.add_argument("--analytics", action="store_true",
+                    help="add an appendix with desk / colour / round statistics")
+    args = ap.parse_args()
+    build_pdf(args.db, args.out, chunked=args.chunked, progression=args.progression,
+              compact=args.compact, grayscale=args.grayscale, analytics=args.analytics)
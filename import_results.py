@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk import of board results from an arbiter CSV/TSV export into db.json.
+
+Every row names one board, either by pairing id or by round + the two teams (id, short
+code or name), plus the desk and the result in any notation results.py understands
+(1-0, ½-½, 1/2-1/2, +/- forfeits, ...). Column names are matched case-insensitively:
+
+    pairing_id | pairing                      round | round_number | тур
+    team_a | home | команда a                 team_b | away | команда b
+    desk | desk_number | board | доска       result | res | результат
+
+The whole file is validated first (unknown pairings or desks, unreadable results,
+duplicate boards, BYE pairings); on any error nothing is written. Otherwise board_results
+are upserted, the pairing scores are recomputed from their boards and db.json is replaced
+in one atomic write. Results are stored as the UI writes them ("1-0", "0-1", "0.5-0.5");
+single forfeits are stored as the win they award and additionally get "forfeit": true
+(the UI ignores the flag; analytics and season ratings skip such boards). A double
+forfeit ("--", "0-0") has no UI spelling and is rejected: leave that board empty.
+
+Usage:
+    python import_results.py results.csv [--db db.json] [--white-first] [--dry-run]
+
+--white-first: the result column is written from White's point of view (most arbiter
+programs) instead of team A's; boards where team A has black are flipped.
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from audit import audit, format_issues, has_errors
+from db_store import load_db, save_db
+from results import DRAW, WIN_A, WIN_B, Result, parse_result
+from round_robin import board_pk, desk_colours
+
+# the only result strings the UI reads and writes
+STORED_RESULTS = (WIN_A.text, WIN_B.text, DRAW.text)
+
+COLUMNS = {
+    "pairing": ("pairing_id", "pairing"),
+    "round": ("round", "round_number", "тур"),
+    "team_a": ("team_a", "team_a_id", "home", "команда a", "команда а"),
+    "team_b": ("team_b", "team_b_id", "away", "команда b", "команда б"),
+    "desk": ("desk", "desk_number", "board", "доска"),
+    "result": ("result", "res", "результат"),
+}
+
+# ----------------------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------------------
+def read_rows(path: str) -> Tuple[Dict[str, str], List[Tuple[int, Dict[str, str]]]]:
+    """(column map: field → header, [(line number, row), ...]); the delimiter is sniffed."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(8192)
+        f.seek(0)
+        if path.lower().endswith(".tsv"):
+            delimiter = "\t"
+        else:
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+            except csv.Error:
+                delimiter = ","
+        reader = csv.DictReader(f, delimiter=delimiter)
+        headers = {h.strip().casefold(): h for h in reader.fieldnames or []}
+        colmap = {}
+        for field, names in COLUMNS.items():
+            for name in names:
+                if name in headers:
+                    colmap[field] = headers[name]
+                    break
+        rows = [(i, row) for i, row in enumerate(reader, start=2)]
+    return colmap, rows
+
+# ----------------------------------------------------------------------------------
+# Validation
+# ----------------------------------------------------------------------------------
+class Batch:
+    """Indexes over db.json built once; resolve() turns CSV rows into board updates."""
+
+    def __init__(self, data: Dict[str, Any], white_first: bool = False):
+        self.white_first = white_first
+        self.pairings = {p["id"]: p for p in data.get("pairings", []) or []}
+        round_no = {r["id"]: r.get("round_number") for r in data.get("rounds", []) or []}
+        self.team_key: Dict[str, Any] = {}
+        for t in data.get("teams", []) or []:
+            for k in (t.get("id"), t.get("short_code"), t.get("name")):
+                if k not in (None, ""):
+                    self.team_key.setdefault(str(k).strip().casefold(), t["id"])
+        # (round_number, team) → pairing; a team plays once per round
+        self.by_round_team: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        for p in self.pairings.values():
+            rn = str(round_no.get(p.get("round_id")))
+            for tid in (p.get("team_a_id"), p.get("team_b_id")):
+                if tid is not None:
+                    self.by_round_team[(rn, tid)] = p
+        self.desk_player: Dict[Tuple[Any, Any], Any] = {}
+        for pl in data.get("players", []) or []:
+            self.desk_player[(pl.get("team_id"), pl.get("desk_number"))] = pl.get("id")
+        self.boards: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        for br in data.get("board_results", []) or []:
+            self.boards.setdefault((br.get("pairing_id"), br.get("desk_number")), br)
+
+    def _team(self, raw: str) -> Optional[Any]:
+        return self.team_key.get(raw.strip().casefold())
+
+    def resolve(self, colmap: Dict[str, str], rows: List[Tuple[int, Dict[str, str]]]
+                ) -> Tuple[List[Tuple[Dict[str, Any], int, Result]], List[str]]:
+        """[(pairing, desk, result from team A's side)], [error messages]."""
+        errors: List[str] = []
+        if "result" not in colmap or "desk" not in colmap:
+            return [], ["the file needs a result column and a desk column"]
+        if "pairing" not in colmap and not {"round", "team_a", "team_b"} <= set(colmap):
+            return [], ["the file needs pairing_id, or round + team_a + team_b columns"]
+
+        updates = []
+        seen: Dict[Tuple[Any, int], int] = {}
+        for line, row in rows:
+            def cell(field: str) -> str:
+                return (row.get(colmap[field]) or "").strip() if field in colmap else ""
+
+            swapped = False
+            if cell("pairing"):
+                pairing = self.pairings.get(cell("pairing"))
+                if pairing is None:
+                    errors.append(f"line {line}: unknown pairing {cell('pairing')!r}")
+                    continue
+            else:
+                ta, tb = self._team(cell("team_a")), self._team(cell("team_b"))
+                if ta is None or tb is None:
+                    bad = cell("team_a") if ta is None else cell("team_b")
+                    errors.append(f"line {line}: unknown team {bad!r}")
+                    continue
+                pairing = self.by_round_team.get((cell("round"), ta))
+                if pairing is None or {pairing.get("team_a_id"), pairing.get("team_b_id")} != {ta, tb}:
+                    errors.append(f"line {line}: no pairing {cell('team_a')} – {cell('team_b')} in round {cell('round')!r}")
+                    continue
+                swapped = pairing.get("team_a_id") != ta
+            if pairing.get("team_b_id") is None:
+                errors.append(f"line {line}: pairing {pairing['id']!r} is a BYE")
+                continue
+
+            try:
+                desk = int(cell("desk"))
+            except ValueError:
+                errors.append(f"line {line}: bad desk {cell('desk')!r}")
+                continue
+            key = (pairing["id"], desk)
+            if key not in self.boards and (pairing["team_a_id"], desk) not in self.desk_player \
+                    and (pairing["team_b_id"], desk) not in self.desk_player:
+                errors.append(f"line {line}: neither team has a player on desk {desk}")
+                continue
+            if key in seen:
+                errors.append(f"line {line}: desk {desk} of pairing {pairing['id']!r} is already on line {seen[key]}")
+                continue
+            seen[key] = line
+
+            res = parse_result(cell("result"))
+            if res is None:
+                errors.append(f"line {line}: result {cell('result')!r} is not understood")
+                continue
+            if res.text not in STORED_RESULTS:
+                errors.append(f"line {line}: double forfeit {cell('result')!r} cannot be stored "
+                              f"(db.json knows only {', '.join(STORED_RESULTS)}); leave the board empty")
+                continue
+            # white-first results are oriented by colour alone; the team order in the
+            # row does not matter then
+            if swapped and not self.white_first:
+                res = res.flipped()
+            if self.white_first and self._a_colour(pairing, desk) == "black":
+                res = res.flipped()
+            updates.append((pairing, desk, res))
+        return updates, errors
+
+    def _a_colour(self, pairing: Dict[str, Any], desk: int) -> str:
+        br = self.boards.get((pairing["id"], desk))
+        if br is not None and "player_a_color" in br:
+            return str(br["player_a_color"]).lower()
+        if br is not None and "player_b_color" in br:
+            return "white" if str(br["player_b_color"]).lower() == "black" else "black"
+        return desk_colours(desk)[0]
+
+# ----------------------------------------------------------------------------------
+# Apply
+# ----------------------------------------------------------------------------------
+def apply(data: Dict[str, Any], batch: Batch, updates: List[Tuple[Dict[str, Any], int, Result]]) -> Dict[str, int]:
+    """Upsert boards and recompute the touched pairings' scores (in place)."""
+    created = updated = 0
+    boards_list = data.setdefault("board_results", [])
+    touched = set()
+    for pairing, desk, res in updates:
+        br = batch.boards.get((pairing["id"], desk))
+        if br is None:
+            a_color, b_color = desk_colours(desk)
+            br = {"id": board_pk(pairing["id"], desk), "pairing_id": pairing["id"], "desk_number": desk,
+                  "player_a_id": batch.desk_player.get((pairing["team_a_id"], desk)),
+                  "player_b_id": batch.desk_player.get((pairing["team_b_id"], desk)),
+                  "result": "", "player_a_color": a_color, "player_b_color": b_color}
+            boards_list.append(br)
+            batch.boards[(pairing["id"], desk)] = br
+            created += 1
+        else:
+            updated += 1
+        br["result"] = res.text
+        if res.forfeit:
+            br["forfeit"] = True
+        else:
+            br.pop("forfeit", None)
+        touched.add(pairing["id"])
+
+    sums = {pid: [0.0, 0.0] for pid in touched}
+    for (pid, _desk), br in batch.boards.items():
+        if pid in sums:
+            res = parse_result(br.get("result"))
+            if res is not None:
+                sums[pid][0] += res.a
+                sums[pid][1] += res.b
+    for pid, (a, b) in sums.items():
+        p = batch.pairings[pid]
+        p["team_a_points"] = int(a) if a == int(a) else a
+        p["team_b_points"] = int(b) if b == int(b) else b
+    return {"created": created, "updated": updated, "pairings": len(touched)}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Import board results from a CSV/TSV file into db.json.")
+    ap.add_argument("file")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--white-first", action="store_true", help="results are written from White's side, not team A's")
+    ap.add_argument("--dry-run", action="store_true", help="validate and report, do not write db.json")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    data = load_db(args.db)
+    colmap, rows = read_rows(args.file)
+    batch = Batch(data, white_first=args.white_first)
+    updates, errors = batch.resolve(colmap, rows)
+    if errors:
+        print("\n".join(errors[:50]) + (f"\n... and {len(errors) - 50} more" if len(errors) > 50 else ""))
+        print(f"❌ {len(errors)} bad row(s) in {args.file}; db.json not changed")
+        return 1
+
+    stats = apply(data, batch, updates)
+    issues = audit(data)
+    if has_errors(issues):
+        print(format_issues([i for i in issues if i["severity"] == "error"], limit=20))
+        print(f"❌ the imported data would not pass the audit; {args.db} not changed")
+        return 1
+    if not args.dry_run:
+        save_db(data, args.db)
+    print(f"{len(rows)} row(s): {stats['updated']} board(s) updated, {stats['created']} created, "
+          f"{stats['pairings']} pairing score(s) recomputed")
+    print(("✅ dry run, nothing written" if args.dry_run else f"✅ {args.db} written") +
+          f" in {time.perf_counter() - t0:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
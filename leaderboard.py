@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Top-K leaderboard index over player standings rows.
+
+Rows are kept in sorted per-group lists (bisect), one list per value of each
+dimension: desk, team and any custom categories (e.g. women, staff vs students).
+Updating a player costs O(log n) search + a list insert; reading the top K of any
+group is an O(K) slice, so prize tables stay cheap with thousands of players.
+
+Order within a group: points ↓, TB-Desk ↓, TB-Black ↓, then first-seen order
+(the same tie behaviour as the stable sort it replaces in the report).
+
+    board = Leaderboard(latest["player_standings"],
+                        categories={"status": lambda r: "staff" if r.get("is_staff") else "student"})
+    board.top("desk", 1, 2)            # two best players on desk 1
+    board.top("status", "staff", 3)    # best three staff players
+    board.upsert({...updated row...})  # incremental update
+
+Rows passed to the constructor (or add()) are all kept, even when two share a
+player_id — the report lists both, as the linear scan did, and audit.py reports the
+bad data. upsert() replaces the first row of that player.
+"""
+
+from __future__ import annotations
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Row = Dict[str, Any]
+Classifier = Callable[[Row], Any]
+
+BUILTIN_DIMENSIONS: Dict[str, Classifier] = {
+    "desk": lambda r: r.get("desk_number"),
+    "team": lambda r: r.get("team_id"),
+}
+
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Leaderboard:
+    def __init__(self, rows: Iterable[Row] = (), categories: Optional[Dict[str, Classifier]] = None):
+        self.dimensions: Dict[str, Classifier] = dict(BUILTIN_DIMENSIONS)
+        self.dimensions.update(categories or {})
+        self._rows: Dict[Any, Row] = {}
+        self._keys: Dict[Any, Tuple] = {}
+        self._groups_of: Dict[Any, List[Tuple[str, Any]]] = {}
+        self._groups: Dict[Tuple[str, Any], List[Tuple]] = {}
+        self._seq: Dict[Any, int] = {}
+        self._by_name_desk: Dict[Tuple[Any, Any], List[Tuple[int, Any]]] = {}
+        for row in rows:
+            self.add(row)
+
+    def _pid(self, row: Row) -> Any:
+        pid = row.get("player_id")
+        if pid is None:
+            pid = ("name", row.get("full_name"), row.get("team_id"), row.get("desk_number"))
+        return pid
+
+    def _sort_key(self, pid: Any, row: Row) -> Tuple:
+        # seq is unique, so comparisons never reach pid (which may be of any type)
+        return (-_num(row.get("points")), -_num(row.get("tb_desk")), -_num(row.get("tb_black")),
+                self._seq[pid], pid)
+
+    # ---- updates ----
+    def add(self, row: Row) -> Any:
+        """Insert a row as a new entry; a repeated player id gets its own key ("dup", id, n)."""
+        base = pid = self._pid(row)
+        n = 1
+        while pid in self._rows:
+            n += 1
+            pid = ("dup", base, n)
+        self._insert(pid, row)
+        return pid
+
+    def upsert(self, row: Row) -> None:
+        """Insert a player row or replace the previous row for the same player."""
+        pid = self._pid(row)
+        if pid in self._rows:
+            self.remove(pid)
+        self._insert(pid, row)
+
+    def _insert(self, pid: Any, row: Row) -> None:
+        self._seq.setdefault(pid, len(self._seq))
+        key = self._sort_key(pid, row)
+        groups = []
+        for dim, classify in self.dimensions.items():
+            value = classify(row)
+            if value is None or value is False:
+                continue
+            g = (dim, value)
+            insort(self._groups.setdefault(g, []), key)
+            groups.append(g)
+        self._rows[pid] = row
+        self._keys[pid] = key
+        self._groups_of[pid] = groups
+        insort(self._by_name_desk.setdefault((row.get("full_name"), row.get("desk_number")), []),
+               (self._seq[pid], pid))
+
+    def remove(self, pid: Any) -> None:
+        row = self._rows.pop(pid, None)
+        if row is None:
+            return
+        key = self._keys.pop(pid)
+        for g in self._groups_of.pop(pid):
+            lst = self._groups[g]
+            del lst[bisect_left(lst, key)]
+            if not lst:
+                del self._groups[g]
+        nd = (row.get("full_name"), row.get("desk_number"))
+        same = self._by_name_desk[nd]
+        same.remove((self._seq[pid], pid))
+        if not same:
+            del self._by_name_desk[nd]
+
+    # ---- queries ----
+    def top(self, dimension: str, value: Any, k: int) -> List[Row]:
+        """Best ``k`` rows of one group, e.g. top("desk", 1, 2)."""
+        return [self._rows[key[-1]] for key in self._groups.get((dimension, value), [])[:k]]
+
+    def values(self, dimension: str) -> List[Any]:
+        """All group values present for a dimension (e.g. every desk number)."""
+        return [v for (dim, v) in self._groups if dim == dimension]
+
+    def get(self, pid: Any) -> Optional[Row]:
+        return self._rows.get(pid)
+
+    def find(self, full_name: Any, desk_number: Any) -> Optional[Row]:
+        """First row with this name on this desk (what the prize proof table needs)."""
+        same = self._by_name_desk.get((full_name, desk_number))
+        return self._rows[same[0][1]] if same else None
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Round-by-round team standings: match points, W/D/L, TB-Desk, TB-Black and place after
+every round, in one pass.
+
+Each pairing's contribution (generate_tournament_report.pairing_contribution, the same
+numbers the standings page sums) is computed once and bucketed by round; the standings
+after round k are the prefix sums of those buckets, so all rounds together cost about as
+much as the final table plus one sort per round. The last round equals the team
+standings page.
+
+Usage:
+    python progression.py [--db db.json]                 # place table on stdout
+    python progression.py --json progression.json --csv progression.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from generate_tournament_report import (
+    CONTRIB_FIELDS, load_db, match_context, pairing_contribution, pick_latest_results,
+    standings_sort_key,
+)
+
+CSV_FIELDS = ["round", "rank", "team_id", "name", *CONTRIB_FIELDS]
+
+
+def compute_progression(latest: Optional[Dict[str, Any]], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    {"rounds": [1, 2, ...],
+     "teams": [{"team_id", "name", "rounds": [{"round", "rank", "points", "wins", "draws",
+                                                "losses", "tb_desk", "tb_black"}, ...]}, ...]}
+    Teams are ordered by their final place.
+    """
+    teams = data.get("teams", []) or []
+    rounds = sorted(data.get("rounds", []) or [], key=lambda r: r.get("round_number", 0))
+    round_pos = {r.get("id"): i for i, r in enumerate(rounds)}
+    team_pos = {t.get("id"): i for i, t in enumerate(teams)}
+    width = len(CONTRIB_FIELDS)
+
+    # per-round deltas: deltas[round][team] = contribution of that round's pairings
+    alpha, beta, max_desk, boards_by_pairing = match_context(latest, data)
+    deltas = [[None] * len(teams) for _ in rounds]
+    for p in data.get("pairings", []) or []:
+        ri = round_pos.get(p.get("round_id"))
+        if ri is None:
+            continue
+        contrib = pairing_contribution(p, boards_by_pairing.get(p.get("id"), []), max_desk, alpha, beta)
+        for tid, c in (contrib or {}).items():
+            ti = team_pos.get(tid)
+            if ti is None:
+                continue
+            acc = deltas[ri][ti]
+            if acc is None:
+                deltas[ri][ti] = list(c)
+            else:
+                for j in range(width):
+                    acc[j] += c[j]
+
+    # prefix sums + one sort per round
+    cum = [[0.0, 0, 0, 0, 0.0, 0.0] for _ in teams]
+    history: List[List[Dict[str, Any]]] = [[] for _ in teams]
+    for ri, r in enumerate(rounds):
+        rows = []
+        for ti, t in enumerate(teams):
+            d = deltas[ri][ti]
+            if d is not None:
+                acc = cum[ti]
+                for j in range(width):
+                    acc[j] += d[j]
+            pts, w, dr, l, tb_desk, tb_black = cum[ti]
+            rows.append((ti, {"name": t.get("name", ""), "points": float(pts), "tb_desk": float(tb_desk),
+                              "tb_black": float(tb_black), "wdl": {"wins": int(w), "draws": int(dr), "losses": int(l)}}))
+        rows.sort(key=lambda x: standings_sort_key(x[1]))
+        for rank, (ti, row) in enumerate(rows, start=1):
+            history[ti].append({"round": r.get("round_number"), "rank": rank, "points": row["points"],
+                                **row["wdl"], "tb_desk": row["tb_desk"], "tb_black": row["tb_black"]})
+
+    out_teams = [{"team_id": t.get("id"), "name": t.get("name", ""), "rounds": history[ti]}
+                 for ti, t in enumerate(teams)]
+    if rounds:
+        out_teams.sort(key=lambda t: t["rounds"][-1]["rank"])
+    return {"rounds": [r.get("round_number") for r in rounds], "teams": out_teams}
+
+
+def progression_rows(prog: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Long format for CSV: one row per (round, team), ordered by round and place."""
+    rows = [{"team_id": t["team_id"], "name": t["name"], **r} for t in prog["teams"] for r in t["rounds"]]
+    rows.sort(key=lambda r: (r["round"], r["rank"]))
+    return rows
+
+
+def write_csv(prog: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        w.writeheader()
+        for row in progression_rows(prog):
+            w.writerow({k: (round(v, 4) if isinstance(v, float) else v) for k, v in row.items()})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Team standings after every round.")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--json", metavar="PATH", help="write the progression as JSON ('-' for stdout)")
+    ap.add_argument("--csv", metavar="PATH", help="write one row per round and team as CSV")
+    args = ap.parse_args(argv)
+
+    data = load_db(args.db)
+    prog = compute_progression(pick_latest_results(data.get("tournament_results", []) or []), data)
+
+    if args.json == "-":
+        print(json.dumps(prog, ensure_ascii=False, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(prog, f, ensure_ascii=False, indent=2)
+    if args.csv:
+        write_csv(prog, args.csv)
+    if not args.json and not args.csv:
+        name_w = max([len(t["name"]) for t in prog["teams"]] + [7])
+        print(f"{'Команда':<{name_w}}" + "".join(f"{n:>4}" for n in prog["rounds"]) + "   Очки")
+        for t in prog["teams"]:
+            last = t["rounds"][-1]["points"] if t["rounds"] else 0.0
+            print(f"{t['name']:<{name_w}}" + "".join(f"{r['rank']:>4}" for r in t["rounds"]) + f"{last:>7.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Warm rendering daemon + thin CLI client (Unix socket).
+
+The daemon imports both generators once, so ReportLab, font discovery, TTFont parsing,
+the style sheets and the decoded logo stay in memory; each request only pays for
+load_db + layout. The client sends one JSON line and waits for one JSON line back.
+
+  python render_daemon.py serve                       # start the daemon (foreground)
+  python render_daemon.py report [--db db.json] [--out tournament_report.pdf]
+  python render_daemon.py sheets [--round N ...] [--db db.json] [--out rounds_sheets.pdf]
+  python render_daemon.py ping | stop
+
+If the daemon is not running (or the platform has no AF_UNIX), the client builds
+in-process instead, i.e. with the usual cold start.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SOCKET = os.environ.get(
+    "CHESS_RENDER_SOCKET", os.path.join(tempfile.gettempdir(), "chess-render.sock")
+)
+
+# ----------------------------------------------------------------------------------
+# Jobs (run inside the daemon, or in-process as a fallback)
+# ----------------------------------------------------------------------------------
+def run_job(req: Dict[str, Any]) -> Dict[str, Any]:
+    cmd = req.get("cmd")
+    if cmd == "ping":
+        return {"ok": True, "pid": os.getpid()}
+
+    from audit import AuditError, format_issues
+
+    t0 = time.perf_counter()
+    resp: Dict[str, Any] = {}
+    try:
+        if cmd == "report":
+            from generate_tournament_report import load_db, render_report
+            out = req.get("out") or "tournament_report.pdf"
+            issues = render_report(load_db(req.get("db") or "db.json"), out)
+        elif cmd == "sheets":
+            from generate_round_sheets import load_db, render_sheets
+            out = req.get("out") or "rounds_sheets.pdf"
+            data = load_db(req.get("db") or "db.json")
+            if req.get("rounds"):
+                known = {r.get("round_number") for r in data.get("rounds", []) or []}
+                missing = sorted(set(req["rounds"]) - known)
+                if missing:
+                    resp["missing_rounds"] = missing
+            issues = render_sheets(data, out, round_numbers=req.get("rounds"))
+        else:
+            return {"ok": False, "error": f"unknown command: {cmd!r}"}
+    except (AuditError, ValueError) as e:  # data problems: report them, don't crash the client
+        return {"ok": False, "error": str(e)}
+    resp.update({"ok": True, "out": out, "seconds": round(time.perf_counter() - t0, 3),
+                 "warnings": len(issues)})
+    if issues:
+        resp["warning_messages"] = format_issues(issues, limit=10).splitlines()
+    return resp
+
+# ----------------------------------------------------------------------------------
+# Daemon
+# ----------------------------------------------------------------------------------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            req = json.loads(line.decode("utf-8"))
+        except ValueError:
+            self._reply({"ok": False, "error": "bad request"})
+            return
+        if req.get("cmd") == "stop":
+            self._reply({"ok": True})
+            self.server._stop_requested = True
+            return
+        try:
+            resp = run_job(req)
+        except Exception as e:  # keep the daemon alive on a broken db.json etc.
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self._reply(resp)
+
+    def _reply(self, resp: Dict[str, Any]) -> None:
+        self.wfile.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def serve(sock_path: str) -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("Unix sockets are not available on this platform.")
+
+    t0 = time.perf_counter()
+    # Warm-up: everything that is otherwise paid on each cold start
+    import generate_tournament_report as report
+    import generate_round_sheets  # noqa: F401
+    report.logo_image()
+    warm = time.perf_counter() - t0
+
+    if os.path.exists(sock_path):
+        try:
+            _send({"cmd": "ping"}, sock_path)
+            raise SystemExit(f"A daemon is already listening on {sock_path}")
+        except OSError:
+            os.unlink(sock_path)  # stale socket from a crashed daemon
+
+    # Builds share ReportLab's global font registry, so requests are handled one at a time
+    with socketserver.UnixStreamServer(sock_path, _Handler) as server:
+        server._stop_requested = False
+        print(f"✅ Render daemon ready on {sock_path} (warm-up {warm:.2f}s)")
+        try:
+            while not server._stop_requested:
+                server.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(sock_path)
+
+# ----------------------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------------------
+def _send(req: Dict[str, Any], sock_path: str) -> Dict[str, Any]:
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("AF_UNIX is not supported")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(sock_path)
+        s.sendall((json.dumps(req, ensure_ascii=False) + "\n").encode("utf-8"))
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    return json.loads(buf.decode("utf-8"))
+
+
+def request(req: Dict[str, Any], sock_path: str = DEFAULT_SOCKET, fallback: bool = True) -> Dict[str, Any]:
+    """Send a job to the daemon; build in-process if it is not reachable and fallback is allowed."""
+    try:
+        return _send(req, sock_path)
+    except OSError:
+        if not fallback or req.get("cmd") in ("ping", "stop"):
+            return {"ok": False, "error": f"daemon is not running on {sock_path}"}
+        resp = run_job(req)
+        resp["cold"] = True
+        return resp
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Warm PDF rendering daemon and its client.")
+    ap.add_argument("--socket", default=DEFAULT_SOCKET)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("serve", help="run the daemon in the foreground")
+    p = sub.add_parser("report", help="build the tournament report")
+    p.add_argument("--db", default="db.json")
+    p.add_argument("--out", default="tournament_report.pdf")
+    p.add_argument("--no-fallback", action="store_true", help="fail instead of building in-process")
+    p = sub.add_parser("sheets", help="build round sheets (all rounds, or only --round N)")
+    p.add_argument("--db", default="db.json")
+    p.add_argument("--out", default="rounds_sheets.pdf")
+    p.add_argument("--round", dest="rounds", type=int, action="append")
+    p.add_argument("--no-fallback", action="store_true", help="fail instead of building in-process")
+    sub.add_parser("ping", help="check that the daemon is up")
+    sub.add_parser("stop", help="ask the daemon to exit")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "serve":
+        serve(args.socket)
+        return 0
+
+    req: Dict[str, Any] = {"cmd": args.cmd}
+    if args.cmd in ("report", "sheets"):
+        # the daemon has its own cwd: send absolute paths
+        req["db"] = os.path.abspath(args.db)
+        req["out"] = os.path.abspath(args.out)
+        if args.cmd == "sheets" and args.rounds:
+            req["rounds"] = args.rounds
+    resp = request(req, args.socket, fallback=not getattr(args, "no_fallback", False))
+
+    if not resp.get("ok"):
+        print(f"❌ {resp.get('error')}", file=sys.stderr)
+        return 1
+    if "out" in resp:
+        mode = "cold, in-process" if resp.get("cold") else "daemon"
+        print(f"✅ PDF generated: {resp['out']} ({resp['seconds']:.2f}s, {mode})")
+        if resp.get("missing_rounds"):
+            print(f"⚠ no such round(s): {', '.join(map(str, resp['missing_rounds']))}")
+        if resp.get("warnings"):
+            print(f"⚠ {resp['warnings']} warning(s) in the data:")
+            for line in resp.get("warning_messages", []):
+                print(f"   {line}")
+    else:
+        print("✅ ok" + (f" (pid {resp['pid']})" if "pid" in resp else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+One lookup table for board result notations, shared by the report, the auditor and the
+CSV importer.
+
+db.json stores the three strings the UI writes ("1-0", "0-1", "0.5-0.5"); everything else
+an arbiter export may contain is mapped onto them once, through a table built at import:
+
+    1-0  1:0  1–0  1 - 0                  → "1-0"
+    0-1  0:1  0—1                         → "0-1"
+    ½-½  1/2-1/2  0.5-0.5  0,5:0,5        → "0.5-0.5"
+    ½  1/2  =  draw  remis  ничья         → "0.5-0.5"
+    +-  +/-  +:-  1F-0  (forfeits)        → "1-0"   + forfeit
+    -+  -/+  0-1F                         → "0-1"   + forfeit
+    --  -/-  0-0  0F-0F                   → "0-0"   + forfeit (both lose; read-only, see below)
+
+"0-0" is understood so a hand-edited file still scores correctly, but nothing writes it:
+the UI has no spelling for it, and import_results.py rejects double forfeits. Single
+forfeits are stored as "1-0"/"0-1"; ``forfeit`` tells consumers the game was not played.
+
+Usage:
+    from results import parse_result, result_points
+    parse_result("½–½")   # Result(text="0.5-0.5", a=0.5, b=0.5, forfeit=False)
+    result_points("+/-")  # (1.0, 0.0)
+"""
+
+from __future__ import annotations
+import re
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class Result(NamedTuple):
+    text: str        # canonical string stored in board_results.result
+    a: float         # points of side A (player_a / team_a)
+    b: float
+    forfeit: bool
+
+    def flipped(self) -> "Result":
+        """The same game seen from the other side ("1-0" ↔ "0-1")."""
+        return Result(_FLIP[self.text], self.b, self.a, self.forfeit)
+
+
+WIN_A = Result("1-0", 1.0, 0.0, False)
+WIN_B = Result("0-1", 0.0, 1.0, False)
+DRAW = Result("0.5-0.5", 0.5, 0.5, False)
+_FLIP = {"1-0": "0-1", "0-1": "1-0", "0.5-0.5": "0.5-0.5", "0-0": "0-0"}
+
+# Normalized notation → result. Keys are what _normalize() produces.
+_NOTATIONS: Dict[str, Result] = {
+    "1-0": WIN_A, "0-1": WIN_B, "0.5-0.5": DRAW, "0.5": DRAW, "=": DRAW, "draw": DRAW, "remis": DRAW, "ничья": DRAW,
+    "+-": WIN_A._replace(forfeit=True), "1f-0": WIN_A._replace(forfeit=True), "1-0f": WIN_A._replace(forfeit=True),
+    "-+": WIN_B._replace(forfeit=True), "0-1f": WIN_B._replace(forfeit=True), "0f-1": WIN_B._replace(forfeit=True),
+    "--": Result("0-0", 0.0, 0.0, True), "0-0": Result("0-0", 0.0, 0.0, True), "0f-0f": Result("0-0", 0.0, 0.0, True),
+}
+
+_SEPARATORS = re.compile(r"\s*(?:[-–—−:/]|\s)\s*")
+_SIGNS = re.compile(r"([+-])\s*[/:]?\s*([+-])")  # "+/-", "- : +", "+ -" — the sign is the separator
+
+
+def _normalize(raw: str) -> str:
+    s = raw.strip().casefold().replace("½", "0.5").replace("1/2", "0.5").replace(",", ".")
+    return _SEPARATORS.sub("-", _SIGNS.sub(r"\1\2", s))
+
+
+# Every exact string seen so far → result; pre-seeded with the canonical spellings, so the
+# common case (db.json contents) is one dict lookup.
+_LOOKUP: Dict[str, Optional[Result]] = {r.text: r for r in (WIN_A, WIN_B, DRAW)}
+_LOOKUP.update({"0.5 — 0.5": DRAW, "0.5 - 0.5": DRAW, "0.5–0.5": DRAW, "½-½": DRAW})
+
+
+def parse_result(raw: Any) -> Optional[Result]:
+    """Result for any supported notation; None for empty or unknown strings."""
+    key = raw if isinstance(raw, str) else str(raw or "")
+    try:
+        return _LOOKUP[key]
+    except KeyError:
+        pass
+    res = _NOTATIONS.get(_normalize(key))
+    if len(_LOOKUP) < 4096:  # the vocabulary is tiny; don't grow without bound on garbage input
+        _LOOKUP[key] = res
+    return res
+
+
+def result_points(raw: Any) -> Tuple[float, float]:
+    """(points A, points B); unknown or empty results score 0–0."""
+    res = parse_result(raw)
+    return (res.a, res.b) if res is not None else (0.0, 0.0)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Round-robin schedule generator (Berger tables) with one atomic write to db.json.
+
+Python counterpart of src/services/round_robin.ts, which PUTs every round and pairing
+to json-server one by one. Here the whole schedule — rounds, pairings (explicit BYE rows
+for an odd number of teams) and empty board_results for every desk — is built in memory
+and written in a single atomic replace of db.json.
+
+- Ids are the same as roundPk()/pairingPk(): "<tid>-r<N>", "<tid>-r<N>-<A>-<B|NONE>",
+  boards get "<pairing id>-d<desk>"; re-running the same schedule merges by id. Rounds or
+  pairings that are not part of this schedule (UI-made ones, or an older schedule for a
+  different set of teams) stop the merge; --replace starts over instead.
+- Berger tables (FIDE C.05): the last seed (or the BYE) is the fixed player and alternates
+  colours; team A of a pairing is the "white" team of the Berger table.
+- Board colours alternate per desk: team A has white on odd desks, black on even ones
+  (player_a_color / player_b_color, as read by who_is_black()).
+
+Usage:
+    python round_robin.py [--db db.json] [--tournament ID] [--replace] [--dry-run]
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from audit import audit, format_issues, has_errors
+from db_store import load_db, save_db
+
+# ----------------------------------------------------------------------------------
+# Deterministic ids (same as src/services/round_robin.ts)
+# ----------------------------------------------------------------------------------
+def round_pk(tournament_id: Optional[str], round_number: int) -> str:
+    return f"{tournament_id or 'default'}-r{round_number}"
+
+def pairing_pk(tournament_id: Optional[str], round_number: int,
+               team_a_id: Optional[str], team_b_id: Optional[str]) -> str:
+    return f"{tournament_id or 'default'}-r{round_number}-{team_a_id or 'BYE'}-{team_b_id or 'NONE'}"
+
+def board_pk(pairing_id: str, desk: Any) -> str:
+    return f"{pairing_id}-d{desk}"
+
+def rounds_for_teams(team_count: int) -> int:
+    if team_count <= 1:
+        return 0
+    return team_count - 1 if team_count % 2 == 0 else team_count
+
+# ----------------------------------------------------------------------------------
+# Berger tables
+# ----------------------------------------------------------------------------------
+def berger_rounds(n: int) -> List[List[Tuple[int, int]]]:
+    """
+    Pairings of seeds 0..n-1 (n even) per round as (white, black), FIDE Berger order.
+    Round k uses the circle pairs {x, y} with x + y ≡ 2r (mod n-1), r = k·n/2, which turns
+    the plain circle method into Berger's colour-alternating order; seed n-1 is fixed.
+    """
+    m, half = n - 1, n // 2
+    out = []
+    for k in range(m):
+        r = (k * half) % m
+        table = [(r, m) if k % 2 == 0 else (m, r)]
+        for t in range(1, half):
+            table.append(((r + t) % m, (r - t) % m))
+        out.append(table)
+    return out
+
+# ----------------------------------------------------------------------------------
+# Schedule
+# ----------------------------------------------------------------------------------
+def desk_colours(desk: Any) -> Tuple[str, str]:
+    """(player_a_color, player_b_color): team A is white on odd desks, black on even ones."""
+    try:
+        a_white = int(desk) % 2 == 1
+    except (TypeError, ValueError):
+        a_white = True
+    return ("white", "black") if a_white else ("black", "white")
+
+def build_schedule(data: Dict[str, Any], tournament_id: Optional[str] = None,
+                   team_ids: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Rounds, pairings and empty board_results for a full single round robin."""
+    ids: List[Optional[str]] = list(team_ids if team_ids is not None else [t["id"] for t in data.get("teams", [])])
+    if len(ids) % 2:
+        ids.append(None)  # BYE is the last seed, i.e. the fixed player of the Berger table
+
+    # team_id -> desk -> player_id, in one pass
+    by_team: Dict[Any, Dict[Any, Any]] = {}
+    for p in data.get("players", []) or []:
+        if p.get("desk_number") is not None:
+            by_team.setdefault(p.get("team_id"), {})[p.get("desk_number")] = p.get("id")
+
+    rounds: List[Dict[str, Any]] = []
+    pairings: List[Dict[str, Any]] = []
+    boards: List[Dict[str, Any]] = []
+    if len(ids) < 2:
+        return {"rounds": rounds, "pairings": pairings, "board_results": boards}
+
+    for k, table in enumerate(berger_rounds(len(ids)), start=1):
+        rid = round_pk(tournament_id, k)
+        rounds.append({"id": rid, "tournament_id": tournament_id, "round_number": k, "is_completed": False}
+                      if tournament_id else {"id": rid, "round_number": k, "is_completed": False})
+        for w, b in table:
+            a_id, b_id = ids[w], ids[b]
+            if a_id is None and b_id is None:
+                continue
+            if a_id is None or b_id is None:
+                bye_team = a_id or b_id
+                pairings.append({"id": pairing_pk(tournament_id, k, bye_team, None), "round_id": rid,
+                                 "team_a_id": bye_team, "team_b_id": None, "is_bye": True,
+                                 "team_a_points": 0, "team_b_points": 0})
+                continue
+            pid = pairing_pk(tournament_id, k, a_id, b_id)
+            pairings.append({"id": pid, "round_id": rid, "team_a_id": a_id, "team_b_id": b_id,
+                             "is_bye": False, "team_a_points": 0, "team_b_points": 0})
+            desks_a = by_team.get(a_id, {})
+            desks_b = by_team.get(b_id, {})
+            for desk in sorted(set(desks_a) | set(desks_b)):
+                a_color, b_color = desk_colours(desk)
+                boards.append({
+                    "id": board_pk(pid, desk), "pairing_id": pid, "desk_number": desk,
+                    "player_a_id": desks_a.get(desk), "player_b_id": desks_b.get(desk), "result": "",
+                    "player_a_color": a_color, "player_b_color": b_color,
+                })
+    return {"rounds": rounds, "pairings": pairings, "board_results": boards}
+
+def merge_schedule(data: Dict[str, Any], schedule: Dict[str, List[Dict[str, Any]]],
+                   replace: bool = False) -> Dict[str, int]:
+    """
+    Put the schedule into ``data`` (in place). Existing records with the same id are kept
+    as they are (results already entered survive a re-run); replace=True drops all existing
+    rounds, pairings and board_results first. Returns the number of new records per collection.
+
+    Without replace, ValueError if data already has rounds or pairings that this schedule
+    does not contain — merging next to them would duplicate round numbers and double-book teams.
+    """
+    if not replace:
+        conflicts = []
+        for name in ("rounds", "pairings"):
+            ours = {x["id"] for x in schedule.get(name, [])}
+            foreign = [x.get("id") for x in data.get(name, []) or [] if x.get("id") not in ours]
+            if foreign:
+                shown = ", ".join(repr(i) for i in foreign[:5]) + (" ..." if len(foreign) > 5 else "")
+                conflicts.append(f"{len(foreign)} {name} not in this schedule ({shown})")
+        numbers = {r["round_number"] for r in schedule.get("rounds", [])}
+        ours = {r["id"] for r in schedule.get("rounds", [])}
+        clash = sorted({r.get("round_number") for r in data.get("rounds", []) or []
+                        if r.get("round_number") in numbers and r.get("id") not in ours})
+        if clash:
+            conflicts.append(f"round numbers {', '.join(map(str, clash))} already exist under other ids")
+        if conflicts:
+            raise ValueError("db already has a different schedule: " + "; ".join(conflicts) +
+                             ". Pass --replace to drop existing rounds, pairings and board results.")
+    added = {}
+    for name, rows in schedule.items():
+        current = [] if replace else list(data.get(name, []) or [])
+        have = {x.get("id") for x in current}
+        new = [x for x in rows if x["id"] not in have]
+        data[name] = current + new
+        added[name] = len(new)
+    return added
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Generate a full round-robin schedule into db.json.")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--tournament", default=None, help="tournament id used in round/pairing ids (default: 'default')")
+    ap.add_argument("--replace", action="store_true", help="drop existing rounds/pairings/board_results first")
+    ap.add_argument("--dry-run", action="store_true", help="build the schedule but do not write db.json")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    data = load_db(args.db)
+    schedule = build_schedule(data, args.tournament)
+    t_build = time.perf_counter() - t0
+    try:
+        added = merge_schedule(data, schedule, replace=args.replace)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    issues = audit(data)
+    if has_errors(issues):
+        print(format_issues([i for i in issues if i["severity"] == "error"], limit=20))
+        print(f"❌ the schedule would not pass the audit; {args.db} not changed")
+        return 1
+    write = not args.dry_run and any(added.values())
+    if write:
+        save_db(data, args.db)
+    total = time.perf_counter() - t0
+
+    n_teams = len(data.get("teams", []) or [])
+    print(f"{n_teams} teams → {len(schedule['rounds'])} rounds, {len(schedule['pairings'])} pairings, "
+          f"{len(schedule['board_results'])} boards (built in {t_build:.2f}s)")
+    print("   new: " + ", ".join(f"{k} {v}" for k, v in added.items()))
+    if args.dry_run:
+        print(f"✅ dry run, nothing written in {total:.2f}s")
+    elif write:
+        print(f"✅ {args.db} written in {total:.2f}s")
+    else:
+        print(f"✅ nothing new, {args.db} not changed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+Season aggregator: cumulative player/team statistics across many tournament files.
+
+Within one db.json players are told apart by their id. Every db.json has its own
+4-character ids, so across events teams are matched by a normalized-name hash and players
+by normalized name + team:
+    NFKC, any whitespace (incl. NBSP) collapsed, case-folded, Kazakh letters folded to
+    their Russian look-alikes (ә→а, қ→к, ұ/ү→у, і→и, ...), ё→е, word order ignored.
+Namesakes on different teams therefore stay apart; namesakes on the same team of one event
+are split by desk (same-named teams by short code) and reported by `add`. Manual overrides (JSON) map remaining spellings
+onto one canonical name; "name @ team" targets one team's player, e.g. to follow a transfer:
+    {"players": {"Оразали Аида": "Оразәлі Аида", "Ким Ан @ ШЭМ-2": "Ким Ан @ ШЭМ-1"},
+     "teams": {"ШЭМ 2": "ШЭМ-2"}}
+
+Forfeits and unreadable results are not games: they get no W/D/L and no Elo change.
+Per-event contributions (points, W/D/L, TB-Desk, TB-Black, match points, games) are
+computed once and kept in a state file together with the running totals and Elo ratings,
+so adding one tournament only reads that tournament. Changed or removed events are
+subtracted and the ratings are replayed from the stored games, without re-reading files.
+
+Usage:
+    python season.py add 2024/db.json 2025/ [--state season_state.json] [--overrides aliases.json]
+    python season.py remove 2024/db.json
+    python season.py show [--teams] [--top 30] [--json]
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from db_store import save_db
+from generate_tournament_report import (
+    compute_team_match_standings, desk_weight, get_tb_settings, pick_latest_results, who_is_black,
+)
+from results import parse_result
+
+DEFAULT_STATE = "season_state.json"
+STATE_VERSION = 2
+
+ELO_K = 20.0
+DEFAULT_RATING = 1200.0
+
+PLAYER_FIELDS = ("games", "points", "wins", "draws", "losses", "tb_desk", "tb_black")
+TEAM_FIELDS = ("matches", "points", "wins", "draws", "losses", "tb_desk", "tb_black")
+
+# ----------------------------------------------------------------------------------
+# Identity
+# ----------------------------------------------------------------------------------
+_KAZ_FOLD = str.maketrans({
+    "ә": "а", "ғ": "г", "қ": "к", "ң": "н", "ө": "о", "ұ": "у", "ү": "у", "һ": "х", "і": "и", "ё": "е",
+})
+_SPACES = re.compile(r"\s+")
+
+def normalize_name(name: Any) -> str:
+    s = unicodedata.normalize("NFKC", str(name or ""))
+    s = _SPACES.sub(" ", s).strip().casefold().translate(_KAZ_FOLD)
+    return " ".join(sorted(s.split(" "))) if s else ""
+
+def clean_name(name: Any) -> str:
+    """Display form: same characters, tidy whitespace."""
+    return _SPACES.sub(" ", unicodedata.normalize("NFKC", str(name or ""))).strip()
+
+
+def _hash_key(prefix: str, norm: str) -> str:
+    return prefix + hashlib.sha1(norm.encode("utf-8")).hexdigest()[:12]
+
+
+class IdentityIndex:
+    """
+    Stable cross-event keys: teams by normalized name, players by normalized name + team.
+    Manual alias overrides are applied first; player aliases may be "name @ team".
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, Dict[str, str]]] = None):
+        self._teams: Dict[str, str] = {}
+        for alias, canonical in ((overrides or {}).get("teams") or {}).items():
+            self._teams[normalize_name(alias)] = normalize_name(canonical)
+        # (name, team or "") → (name, team or None = keep the player's own team)
+        self._players: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        for alias, canonical in ((overrides or {}).get("players") or {}).items():
+            name, team = self._split(alias)
+            c_name, c_team = self._split(canonical)
+            self._players[(name, team or "")] = (c_name, c_team)
+
+    def _team_norm(self, name: Any) -> str:
+        norm = normalize_name(name)
+        return self._teams.get(norm, norm)
+
+    def _split(self, spec: str) -> Tuple[str, Optional[str]]:
+        name, sep, team = str(spec).partition(" @ ")
+        return normalize_name(name), (self._team_norm(team) if sep else None)
+
+    def key(self, kind: str, name: Any) -> str:
+        """Team key (kind="teams"); players go through player_key()."""
+        if kind == "players":
+            return self.player_key(name, None)
+        return _hash_key("t:", self._team_norm(name))
+
+    def player_key(self, name: Any, team: Any, suffix: str = "") -> str:
+        norm, team_norm = normalize_name(name), self._team_norm(team)
+        hit = self._players.get((norm, team_norm)) or self._players.get((norm, ""))
+        if hit is not None:
+            norm, team_norm = hit[0], hit[1] if hit[1] is not None else team_norm
+        return _hash_key("p:", f"{norm}@{team_norm}{suffix}")
+
+def _overrides_digest(overrides: Optional[Dict[str, Any]]) -> str:
+    return hashlib.sha1(json.dumps(overrides or {}, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+# ----------------------------------------------------------------------------------
+# One event → contribution
+# ----------------------------------------------------------------------------------
+def event_contribution(data: Dict[str, Any], ids: IdentityIndex) -> Dict[str, Any]:
+    latest = pick_latest_results(data.get("tournament_results", []) or [])
+    alpha, beta = get_tb_settings(latest)
+    teams = {t.get("id"): t for t in data.get("teams", []) or []}
+    players = {p.get("id"): p for p in data.get("players", []) or []}
+    pairings = {p.get("id"): p for p in data.get("pairings", []) or []}
+    round_no = {r.get("id"): r.get("round_number", 0) for r in data.get("rounds", []) or []}
+    boards = data.get("board_results", []) or []
+
+    max_desk = 1
+    for br in boards:
+        try:
+            max_desk = max(max_desk, int(br.get("desk_number", 1) or 1))
+        except (TypeError, ValueError):
+            pass
+
+    # teams whose names normalize to one key are kept apart by their short code (or id)
+    tname = {tid: t.get("name") for tid, t in teams.items()}
+    tkeys: Dict[str, List[Any]] = {}
+    for tid, t in teams.items():
+        tkeys.setdefault(ids.key("teams", t.get("name")), []).append(tid)
+    collisions: List[str] = []
+    for tids in tkeys.values():
+        if len(tids) < 2:
+            continue
+        collisions.append(f"{clean_name(teams[tids[0]].get('name'))}: {len(tids)} teams, split by code")
+        for tid in tids:
+            tname[tid] = f"{teams[tid].get('name')} #{teams[tid].get('short_code') or tid}"
+
+    # within the event players are their ids; the cross-event key is name + team
+    def team_name(p: Dict[str, Any]) -> Any:
+        return tname.get(p.get("team_id"))
+
+    pkey = {pid: ids.player_key(p.get("full_name"), team_name(p)) for pid, p in players.items()}
+    owners: Dict[str, List[Any]] = {}
+    for pid, key in pkey.items():
+        owners.setdefault(key, []).append(pid)
+    for key, pids in owners.items():
+        if len(pids) < 2:
+            continue
+        p0 = players[pids[0]]
+        collisions.append(f"{clean_name(p0.get('full_name'))} ({clean_name(team_name(p0))}): "
+                          f"{len(pids)} players, split by desk")
+        for pid in pids:
+            p = players[pid]
+            pkey[pid] = ids.player_key(p.get("full_name"), team_name(p), f"#{p.get('desk_number', pid)}")
+
+    out_players: Dict[str, Dict[str, Any]] = {}
+    for pid, p in players.items():
+        out_players[pkey[pid]] = {
+            "name": clean_name(p.get("full_name")),
+            "team": ids.key("teams", team_name(p)),
+            "rating": p.get("rating"),
+            **{f: 0 for f in PLAYER_FIELDS},
+        }
+
+    # forfeits and unreadable results are not games: no W/D/L, no rating change
+    games: List[Tuple[int, int, str, str, float]] = []
+    for br in boards:
+        p = pairings.get(br.get("pairing_id"))
+        res = parse_result(br.get("result"))
+        if p is None or p.get("team_b_id") is None or res is None or res.forfeit or br.get("forfeit"):
+            continue
+        a, b = br.get("player_a_id"), br.get("player_b_id")
+        if a not in pkey or b not in pkey:
+            continue
+        a_pts, b_pts = res.a, res.b
+        try:
+            desk = int(br.get("desk_number", 1) or 1)
+        except (TypeError, ValueError):
+            desk = 1
+        w = desk_weight(desk, max_desk, alpha)
+        black = who_is_black(br)
+        for side, pid, pts in (("A", a, a_pts), ("B", b, b_pts)):
+            row = out_players[pkey[pid]]
+            row["games"] += 1
+            row["points"] += pts
+            row["wins" if pts == 1.0 else "draws" if pts == 0.5 else "losses"] += 1
+            row["tb_desk"] += pts * w
+            row["tb_black"] += pts * (1.0 + beta) if black == side else pts
+        games.append((round_no.get(p.get("round_id"), 0), desk, pkey[a], pkey[b], a_pts))
+    games.sort(key=lambda g: (g[0], g[1]))
+
+    out_teams: Dict[str, Dict[str, Any]] = {}
+    for row in compute_team_match_standings(latest, data):
+        wdl = row.get("wdl", {})
+        name = tname.get(row.get("team_id"), row.get("name"))
+        out_teams[ids.key("teams", name)] = {
+            "name": clean_name(name),
+            "matches": wdl.get("wins", 0) + wdl.get("draws", 0) + wdl.get("losses", 0),
+            "points": row.get("points", 0.0),
+            "wins": wdl.get("wins", 0), "draws": wdl.get("draws", 0), "losses": wdl.get("losses", 0),
+            "tb_desk": row.get("tb_desk", 0.0), "tb_black": row.get("tb_black", 0.0),
+        }
+    # Only the (player, opponent, score) part is needed to replay ratings
+    return {"players": out_players, "teams": out_teams, "games": [[g[2], g[3], g[4]] for g in games],
+            "collisions": collisions}
+
+# ----------------------------------------------------------------------------------
+# Season state
+# ----------------------------------------------------------------------------------
+def _empty_state(overrides_digest: str) -> Dict[str, Any]:
+    return {"version": STATE_VERSION, "overrides": overrides_digest, "events": [],
+            "players": {}, "teams": {}, "ratings": {}}
+
+def _accumulate(totals: Dict[str, Dict[str, Any]], contrib: Dict[str, Dict[str, Any]],
+                fields: Tuple[str, ...], sign: int) -> None:
+    for key, row in contrib.items():
+        tot = totals.setdefault(key, {"name": row["name"], "events": 0, **{f: 0 for f in fields}})
+        for f in fields:
+            tot[f] = round(tot[f] + sign * row[f], 6)
+        tot["events"] += sign
+        if sign > 0:
+            tot["name"] = row["name"]  # latest spelling wins for display
+            if "team" in row:
+                tot["team"] = row["team"]
+        if tot["events"] <= 0:
+            del totals[key]
+
+def _play_ratings(ratings: Dict[str, float], event: Dict[str, Any]) -> None:
+    for key, row in event["players"].items():
+        if key not in ratings:
+            try:
+                ratings[key] = float(row.get("rating") or DEFAULT_RATING)
+            except (TypeError, ValueError):
+                ratings[key] = DEFAULT_RATING
+    for a, b, score in event["games"]:
+        ra, rb = ratings[a], ratings[b]
+        expected = 1.0 / (1.0 + 10 ** ((rb - ra) / 400.0))
+        delta = ELO_K * (score - expected)
+        ratings[a] = round(ra + delta, 3)
+        ratings[b] = round(rb - delta, 3)
+
+
+class Season:
+    def __init__(self, state_path: str = DEFAULT_STATE, overrides: Optional[Dict[str, Any]] = None):
+        self.state_path = state_path
+        self.ids = IdentityIndex(overrides)
+        digest = _overrides_digest(overrides)
+        self.state = _empty_state(digest)
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                self.state = state
+            elif state.get("events"):
+                # older key scheme: keep the event list, refresh_stale() re-reads it
+                self.state["events"] = state["events"]
+                self.state["overrides"] = None
+        self._stale = self.state.get("overrides") != digest
+        self.state["overrides"] = digest
+
+    def _event_index(self, path: str) -> Optional[int]:
+        for i, ev in enumerate(self.state["events"]):
+            if ev["path"] == path:
+                return i
+        return None
+
+    def add(self, db_path: str, label: Optional[str] = None) -> str:
+        """Add (or refresh) one tournament. Returns "added", "updated" or "unchanged"."""
+        self.refresh_stale()
+        path = str(Path(db_path).resolve())
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        i = self._event_index(path)
+        if i is not None and self.state["events"][i]["sha1"] == digest:
+            return "unchanged"
+        event = {"path": path, "sha1": digest, "label": label or Path(path).parent.name,
+                 **event_contribution(json.loads(raw.decode("utf-8")), self.ids)}
+        if i is None:
+            self.state["events"].append(event)
+            self._apply(event, +1)
+            _play_ratings(self.state["ratings"], event)  # appended last: continue from current ratings
+            return "added"
+        self._apply(self.state["events"][i], -1)
+        self.state["events"][i] = event
+        self._apply(event, +1)
+        self._replay_ratings()
+        return "updated"
+
+    def remove(self, db_path: str) -> bool:
+        self.refresh_stale()
+        i = self._event_index(str(Path(db_path).resolve()))
+        if i is None:
+            return False
+        self._apply(self.state["events"].pop(i), -1)
+        self._replay_ratings()
+        return True
+
+    def _apply(self, event: Dict[str, Any], sign: int) -> None:
+        _accumulate(self.state["players"], event["players"], PLAYER_FIELDS, sign)
+        _accumulate(self.state["teams"], event["teams"], TEAM_FIELDS, sign)
+
+    def _replay_ratings(self) -> None:
+        self.state["ratings"] = {}
+        for ev in self.state["events"]:
+            _play_ratings(self.state["ratings"], ev)
+
+    def refresh_stale(self) -> bool:
+        """If the identity overrides changed, re-read every stored event with the new keys."""
+        if not self._stale:
+            return False
+        events = self.state["events"]
+        self.state = _empty_state(self.state["overrides"])
+        for ev in events:
+            with open(ev["path"], "rb") as f:
+                raw = f.read()
+            event = {"path": ev["path"], "sha1": hashlib.sha1(raw).hexdigest(), "label": ev["label"],
+                     **event_contribution(json.loads(raw.decode("utf-8")), self.ids)}
+            self.state["events"].append(event)
+            self._apply(event, +1)
+        self._replay_ratings()
+        self._stale = False
+        return True
+
+    def save(self) -> None:
+        save_db(self.state, self.state_path)
+
+    # ---- results ----
+    def player_table(self) -> List[Dict[str, Any]]:
+        rows = []
+        for key, tot in self.state["players"].items():
+            rows.append({"key": key, **tot, "rating": self.state["ratings"].get(key)})
+        rows.sort(key=lambda r: (-r["points"], -r["tb_desk"], -r["tb_black"], -r["wins"], r["name"]))
+        return rows
+
+    def team_table(self) -> List[Dict[str, Any]]:
+        rows = [{"key": key, **tot} for key, tot in self.state["teams"].items()]
+        rows.sort(key=lambda r: (-r["points"], -r["tb_desk"], -r["tb_black"], -r["wins"], r["name"]))
+        return rows
+
+# ----------------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------------
+def _expand(inputs: List[str]) -> List[str]:
+    out = []
+    for raw in inputs:
+        p = Path(raw)
+        if p.is_dir():
+            out.extend(str(x) for x in sorted(p.rglob("db.json")))
+        else:
+            out.append(raw)
+    return out
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Season-wide standings across tournament files.")
+    ap.add_argument("--state", default=DEFAULT_STATE)
+    ap.add_argument("--overrides", help="JSON alias file: {\"players\": {alias: canonical}, \"teams\": {...}}")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("add", help="add or refresh tournaments (files or directories with db.json)")
+    p.add_argument("inputs", nargs="+")
+    p = sub.add_parser("remove", help="drop tournaments from the season")
+    p.add_argument("inputs", nargs="+")
+    p = sub.add_parser("show", help="print season standings")
+    p.add_argument("--teams", action="store_true")
+    p.add_argument("--top", type=int, default=0)
+    p.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    overrides = None
+    if args.overrides:
+        with open(args.overrides, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    season = Season(args.state, overrides)
+    rebuilt = season.refresh_stale()
+
+    if args.cmd == "add":
+        for path in _expand(args.inputs):
+            print(f"{season.add(path):>9}  {path}")
+            ev = season.state["events"][season._event_index(str(Path(path).resolve()))]
+            for c in ev.get("collisions", []):
+                print(f"   ⚠ same name: {c}")
+        season.save()
+    elif args.cmd == "remove":
+        for path in _expand(args.inputs):
+            print(f"{'removed' if season.remove(path) else 'not found':>9}  {path}")
+        season.save()
+    else:
+        if rebuilt:
+            season.save()
+        rows = season.team_table() if args.teams else season.player_table()
+        if args.top:
+            rows = rows[:args.top]
+        if args.json:
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+            return 0
+        print(f"{len(season.state['events'])} event(s)")
+        team_names = {k: t["name"] for k, t in season.state["teams"].items()}
+        for i, r in enumerate(rows, start=1):
+            rating = f"{r['rating']:.0f}" if r.get("rating") is not None else "—"
+            name = r["name"] if args.teams else f"{r['name']} ({team_names.get(r.get('team'), '?')})"
+            print(f"{i:>4}. {name:<44} ev {r['events']:>2}  pts {r['points']:>5g}  "
+                  f"W/D/L {r['wins']}/{r['draws']}/{r['losses']}  TB-Desk {r['tb_desk']:.2f}  "
+                  f"TB-Black {r['tb_black']:.2f}" + ("" if args.teams else f"  Elo {rating}"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"""
+Local standings HTTP service (stdlib asyncio, no extra dependencies).
+
+- Keeps the indexed tournament model in memory; a background watcher polls db.json
+  and reloads it only when its size/mtime (and then its content hash) change.
+- Reloads are applied as per-collection deltas: cached JSON views are dropped only
+  when a collection they depend on actually changed, so ETags stay stable otherwise.
+- Reloads and view builds run in worker threads (asyncio.to_thread), so a large
+  db.json never stalls the event loop; cached views are served straight from the loop.
+- JSON endpoints honour If-None-Match (an ETag list, weak W/ tags or *) and answer 304
+  when the view is unchanged.
+- PDFs are rendered on demand in a process pool and cached by data version;
+  concurrent requests for the same PDF share one build.
+
+Endpoints:
+  GET /api/version              data version + per-collection sizes
+  GET /api/audit                integrity issues of the current data (see audit.py)
+  GET /api/standings/teams      match-point team standings (same as the report)
+  GET /api/standings/players    player standings from the latest results snapshot
+  GET /api/rounds               rounds with pairing counts
+  GET /api/rounds/<n>           pairings of round n with board protocols
+  GET /api/pairings             all pairings with team names
+  GET /api/analytics            round × desk × colour × team cube for DeskTrends (see analytics.py)
+  GET /report.pdf               tournament_report.pdf for the current data
+  GET /sheets.pdf               rounds_sheets.pdf for the current data
+
+Usage:  python standings_server.py [--db db.json] [--host 127.0.0.1] [--port 8765]
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from analytics import Cube
+from audit import audit
+from generate_tournament_report import (
+    compute_team_match_standings, idx_by, parse_result_to_points, pick_latest_results,
+)
+
+COLLECTIONS = ("teams", "players", "board_results", "rounds", "pairings", "tournament_results")
+
+MAX_HEADER_BYTES = 16 * 1024
+KEEPALIVE_TIMEOUT = 30.0
+
+STATUS_TEXT = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+# ----------------------------------------------------------------------------------
+# PDF workers (top-level so they can be pickled into the process pool)
+# ----------------------------------------------------------------------------------
+def _warm_worker() -> None:
+    """Pay font registration / style setup once per worker process."""
+    import generate_tournament_report  # noqa: F401
+    import generate_round_sheets       # noqa: F401
+
+def _render_report_bytes(data: Dict[str, Any]) -> bytes:
+    import io
+    from generate_tournament_report import render_report
+    buf = io.BytesIO()
+    render_report(data, buf)
+    return buf.getvalue()
+
+def _render_sheets_bytes(data: Dict[str, Any]) -> bytes:
+    import io
+    from generate_round_sheets import render_sheets
+    buf = io.BytesIO()
+    render_sheets(data, buf)
+    return buf.getvalue()
+
+PDF_RENDERERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "report": _render_report_bytes,
+    "sheets": _render_sheets_bytes,
+}
+
+# ----------------------------------------------------------------------------------
+# In-memory model
+# ----------------------------------------------------------------------------------
+def _view_team_standings(model: "TournamentModel") -> Any:
+    return compute_team_match_standings(model.latest, model.data)
+
+def _view_player_standings(model: "TournamentModel") -> Any:
+    return (model.latest or {}).get("player_standings", [])
+
+def _view_rounds(model: "TournamentModel") -> Any:
+    out = []
+    for rnd in model.rounds_sorted:
+        out.append({
+            "id": rnd.get("id"),
+            "round_number": rnd.get("round_number"),
+            "is_completed": bool(rnd.get("is_completed")),
+            "pairings": len(model.pairings_by_round.get(rnd.get("id"), [])),
+        })
+    return out
+
+def _pairing_json(model: "TournamentModel", p: Dict[str, Any]) -> Dict[str, Any]:
+    ta = model.teams_by_id.get(p.get("team_a_id"), {})
+    tb = model.teams_by_id.get(p.get("team_b_id"), {})
+    return {
+        "id": p.get("id"),
+        "round_id": p.get("round_id"),
+        "is_bye": bool(p.get("is_bye")) or p.get("team_b_id") is None,
+        "team_a_id": p.get("team_a_id"), "team_a_name": ta.get("name", ""),
+        "team_b_id": p.get("team_b_id"), "team_b_name": tb.get("name", "") if tb else "BYE",
+        "team_a_points": p.get("team_a_points", 0),
+        "team_b_points": p.get("team_b_points", 0),
+    }
+
+def _view_pairings(model: "TournamentModel") -> Any:
+    return [_pairing_json(model, p) for p in model.data.get("pairings", []) or []]
+
+def _round_view(model: "TournamentModel", round_number: int) -> Any:
+    rnd = model.rounds_by_number.get(round_number)
+    if rnd is None:
+        return None
+    pairings = []
+    for p in model.pairings_by_round.get(rnd.get("id"), []):
+        item = _pairing_json(model, p)
+        boards = []
+        for br in sorted(model.boards_by_pairing.get(p.get("id"), []), key=lambda x: x.get("desk_number", 0)):
+            a_pts, b_pts = parse_result_to_points(br.get("result", ""))
+            boards.append({
+                "id": br.get("id"),
+                "desk_number": br.get("desk_number"),
+                "player_a_id": br.get("player_a_id"),
+                "player_a_name": model.players_by_id.get(br.get("player_a_id"), {}).get("full_name", ""),
+                "player_b_id": br.get("player_b_id"),
+                "player_b_name": model.players_by_id.get(br.get("player_b_id"), {}).get("full_name", ""),
+                "player_a_color": br.get("player_a_color"),
+                "player_b_color": br.get("player_b_color"),
+                "result": br.get("result", ""),
+                "points": [a_pts, b_pts],
+            })
+        item["boards"] = boards
+        pairings.append(item)
+    return {"id": rnd.get("id"), "round_number": rnd.get("round_number"), "pairings": pairings}
+
+# view name -> (builder, collections it depends on)
+VIEWS: Dict[str, Tuple[Callable[["TournamentModel"], Any], Tuple[str, ...]]] = {
+    "standings/teams":   (_view_team_standings, ("teams", "pairings", "board_results", "tournament_results")),
+    "standings/players": (_view_player_standings, ("tournament_results",)),
+    "rounds":            (_view_rounds, ("rounds", "pairings")),
+    "pairings":          (_view_pairings, ("teams", "pairings")),
+    "audit":             (lambda model: audit(model.data), COLLECTIONS),
+    "analytics":         (lambda model: Cube.build(model.data).to_json(),
+                          ("teams", "players", "rounds", "pairings", "board_results")),
+}
+ROUND_VIEW_DEPS = ("teams", "players", "rounds", "pairings", "board_results")
+
+def _encode(obj: Any) -> Tuple[str, bytes]:
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return '"%s"' % hashlib.sha1(body).hexdigest()[:20], body
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match is "*" or a comma-separated ETag list; weak W/ tags compare equal."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any((t[2:] if t.startswith("W/") else t) == etag for t in tags)
+
+
+class TournamentModel:
+    """
+    db.json held in memory together with the indexes the views need.
+    refresh() and view() may run in worker threads; the lock keeps a view build from
+    seeing half-swapped data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = ""
+        self.data: Dict[str, Any] = {}
+        self.latest: Optional[Dict[str, Any]] = None
+        self._stat_key: Optional[Tuple[int, int]] = None
+        self._fingerprints: Dict[str, str] = {}
+        self._views: Dict[str, Tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    # ---- loading ----
+    def refresh(self) -> bool:
+        """Re-read db.json if it changed on disk. Returns True when the data changed."""
+        st = os.stat(self.path)
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._stat_key:
+            return False
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self._stat_key = key
+        version = hashlib.sha1(raw).hexdigest()[:16]
+        if version == self.version:
+            return False
+        self.apply(json.loads(raw.decode("utf-8")), version)
+        return True
+
+    def apply(self, data: Dict[str, Any], version: str) -> List[str]:
+        """Swap in new data; only views depending on changed collections are invalidated."""
+        fingerprints = {}
+        for name in COLLECTIONS:
+            fingerprints[name] = hashlib.sha1(json.dumps(data.get(name, []), sort_keys=True,
+                                                         ensure_ascii=False).encode("utf-8")).hexdigest()
+        with self._lock:
+            changed = [name for name in COLLECTIONS if self._fingerprints.get(name) != fingerprints[name]]
+            self.data = data
+            self.version = version
+            self._fingerprints = fingerprints
+            self._reindex()
+            for view in list(self._views):
+                deps = VIEWS[view][1] if view in VIEWS else ROUND_VIEW_DEPS
+                if any(c in changed for c in deps):
+                    del self._views[view]
+        return changed
+
+    def snapshot(self) -> Tuple[Dict[str, Any], str]:
+        """(data, version) from the same reload."""
+        with self._lock:
+            return self.data, self.version
+
+    def _reindex(self) -> None:
+        data = self.data
+        self.latest = pick_latest_results(data.get("tournament_results", []) or [])
+        self.teams_by_id = idx_by(data.get("teams", []) or [])
+        self.players_by_id = idx_by(data.get("players", []) or [])
+        self.rounds_sorted = sorted(data.get("rounds", []) or [], key=lambda r: r.get("round_number", 0))
+        self.rounds_by_number = {r.get("round_number"): r for r in self.rounds_sorted}
+        self.pairings_by_round: Dict[Any, List[Dict[str, Any]]] = {}
+        for p in data.get("pairings", []) or []:
+            self.pairings_by_round.setdefault(p.get("round_id"), []).append(p)
+        self.boards_by_pairing: Dict[Any, List[Dict[str, Any]]] = {}
+        for br in data.get("board_results", []) or []:
+            self.boards_by_pairing.setdefault(br.get("pairing_id"), []).append(br)
+
+    # ---- views ----
+    def cached_view(self, name: str) -> Optional[Tuple[str, bytes]]:
+        return self._views.get(name)
+
+    def view(self, name: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            return self._build_view(name)
+
+    def _build_view(self, name: str) -> Optional[Tuple[str, bytes]]:
+        cached = self._views.get(name)
+        if cached is not None:
+            return cached
+        if name in VIEWS:
+            obj = VIEWS[name][0](self)
+        elif name == "version":
+            return _encode({"version": self.version,
+                            "counts": {c: len(self.data.get(c, []) or []) for c in COLLECTIONS}})
+        elif name.startswith("rounds/"):
+            try:
+                obj = _round_view(self, int(name.split("/", 1)[1]))
+            except ValueError:
+                obj = None
+            if obj is None:
+                return None
+        else:
+            return None
+        self._views[name] = _encode(obj)
+        return self._views[name]
+
+# ----------------------------------------------------------------------------------
+# HTTP server
+# ----------------------------------------------------------------------------------
+class StandingsServer:
+    def __init__(self, model: TournamentModel, pool: ProcessPoolExecutor, poll_interval: float = 1.0):
+        self.model = model
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self._pdf_cache: Dict[Tuple[str, str], bytes] = {}
+        self._pdf_building: Dict[Tuple[str, str], "asyncio.Future[bytes]"] = {}
+
+    async def watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if await asyncio.to_thread(self.model.refresh):
+                    print(f"↻ db reloaded, version {self.model.version}")
+                    # PDFs of superseded versions will never be served again
+                    for key in [k for k in self._pdf_cache if k[1] != self.model.version]:
+                        del self._pdf_cache[key]
+            except (OSError, ValueError) as e:
+                # half-written file or transient error: keep serving the last good model
+                print(f"⚠ db reload failed: {e}")
+
+    async def pdf(self, kind: str) -> Tuple[str, bytes]:
+        """(data version, PDF bytes) from one snapshot, so an ETag built from it matches the body."""
+        data, version = self.model.snapshot()
+        key = (kind, version)
+        if key in self._pdf_cache:
+            return version, self._pdf_cache[key]
+        fut = self._pdf_building.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self.pool, PDF_RENDERERS[kind], data)
+            self._pdf_building[key] = fut
+            fut.add_done_callback(lambda f: self._pdf_done(key, f))
+        # shielded for every waiter, the first included: a client going away must not
+        # cancel the build the others are waiting for
+        return version, await asyncio.shield(fut)
+
+    def _pdf_done(self, key: Tuple[str, str], fut: "asyncio.Future[bytes]") -> None:
+        self._pdf_building.pop(key, None)
+        if not fut.cancelled() and fut.exception() is None and key[1] == self.model.version:
+            self._pdf_cache[key] = fut.result()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 400, b"header too large", "text/plain", keep_alive=False)
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split()
+                if len(parts) != 3:
+                    await self._send(writer, 400, b"bad request", "text/plain", keep_alive=False)
+                    return
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn != "close" and (version == "HTTP/1.1" or conn == "keep-alive")
+                await self._dispatch(writer, method, target.split("?", 1)[0], headers, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            # client went away mid-request or mid-response; nothing left to answer
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, writer, method: str, path: str, headers: Dict[str, str], keep_alive: bool) -> None:
+        if method not in ("GET", "HEAD"):
+            await self._send(writer, 405, b"method not allowed", "text/plain", keep_alive=keep_alive)
+            return
+        head_only = method == "HEAD"
+        path = path.rstrip("/") or "/"
+
+        if path in ("/report.pdf", "/sheets.pdf"):
+            kind = "report" if path == "/report.pdf" else "sheets"
+            etag = '"%s-%s"' % (kind, self.model.version)
+            if etag_matches(headers.get("if-none-match"), etag):
+                await self._send(writer, 304, b"", None, etag=etag, keep_alive=keep_alive)
+                return
+            try:
+                version, body = await self.pdf(kind)
+                etag = '"%s-%s"' % (kind, version)
+            except Exception as e:
+                await self._send(writer, 500, f"PDF build failed: {e}".encode("utf-8"), "text/plain", keep_alive=keep_alive)
+                return
+            await self._send(writer, 200, body, "application/pdf", etag=etag, keep_alive=keep_alive, head_only=head_only)
+            return
+
+        if path.startswith("/api/"):
+            name = path[len("/api/"):]
+            try:
+                res = self.model.cached_view(name) or await asyncio.to_thread(self.model.view, name)
+            except Exception as e:
+                await self._send(writer, 500, str(e).encode("utf-8"), "text/plain", keep_alive=keep_alive)
+                return
+            if res is not None:
+                etag, body = res
+                if etag_matches(headers.get("if-none-match"), etag):
+                    await self._send(writer, 304, b"", None, etag=etag, keep_alive=keep_alive)
+                else:
+                    await self._send(writer, 200, body, "application/json; charset=utf-8",
+                                     etag=etag, keep_alive=keep_alive, head_only=head_only)
+                return
+        await self._send(writer, 404, b"not found", "text/plain", keep_alive=keep_alive)
+
+    async def _send(self, writer, status: int, body: bytes, ctype: Optional[str], *,
+                    etag: Optional[str] = None, keep_alive: bool = True, head_only: bool = False) -> None:
+        hdrs = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            f"Content-Length: {0 if status == 304 else len(body)}",
+            "Cache-Control: no-cache",
+            "Access-Control-Allow-Origin: *",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if ctype and status != 304:
+            hdrs.append(f"Content-Type: {ctype}")
+        if etag:
+            hdrs.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(hdrs) + "\r\n\r\n").encode("latin-1"))
+        if status != 304 and not head_only:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(db_path: str, host: str, port: int, workers: int, poll_interval: float) -> None:
+    model = TournamentModel(db_path)
+    await asyncio.to_thread(model.refresh)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        app = StandingsServer(model, pool, poll_interval)
+        server = await asyncio.start_server(app.handle, host, port, limit=MAX_HEADER_BYTES, backlog=1024)
+        watcher = asyncio.create_task(app.watch())
+        print(f"✅ Serving {db_path} (version {model.version}) on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve standings, rounds and PDFs from an in-memory db.json model.")
+    ap.add_argument("--db", default="db.json")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=max(1, min(4, os.cpu_count() or 1)),
+                    help="PDF worker processes")
+    ap.add_argument("--poll", type=float, default=1.0, help="db.json change check interval, seconds")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.workers, args.poll))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import copy
+import pickle
+
+import pytest
+
+from audit import AuditError, audit, check, format_issues, has_errors
+
+
+def _clean():
+    return {
+        "teams": [{"id": "t1", "name": "A"}, {"id": "t2", "name": "B"}, {"id": "t3", "name": "C"}],
+        "players": [{"id": f"{t}-{d}", "team_id": t, "desk_number": d, "full_name": f"{t}{d}"}
+                    for t in ("t1", "t2", "t3") for d in (1, 2)],
+        "rounds": [{"id": "r1", "round_number": 1}],
+        "pairings": [
+            {"id": "p1", "round_id": "r1", "team_a_id": "t1", "team_b_id": "t2",
+             "team_a_points": 1.5, "team_b_points": 0.5},
+            {"id": "p2", "round_id": "r1", "team_a_id": "t3", "team_b_id": None, "is_bye": True},
+        ],
+        "board_results": [
+            {"id": "b1", "pairing_id": "p1", "desk_number": 1, "player_a_id": "t1-1", "player_b_id": "t2-1",
+             "player_a_color": "white", "result": "1-0"},
+            {"id": "b2", "pairing_id": "p1", "desk_number": 2, "player_a_id": "t1-2", "player_b_id": "t2-2",
+             "player_a_color": "black", "result": "½-½"},
+        ],
+        "tournament_results": [{"id": "tr1", "team_standings": [{"team_id": "t1", "name": "A",
+                                                                  "points_from_boards": 1, "points_from_pairings": 1}],
+                                "player_standings": [{"player_id": "t1-1"}]}],
+    }
+
+
+def _codes(data):
+    return {(i["severity"], i["code"]) for i in audit(data)}
+
+
+def test_clean_data_has_no_issues():
+    assert audit(_clean()) == []
+    assert check(_clean()) == []
+
+
+def _mutate(fn):
+    data = _clean()
+    fn(data)
+    return data
+
+
+CASES = [
+    ("missing_id", "error", lambda d: d["teams"].append({"name": "X"})),
+    ("duplicate_id", "error", lambda d: d["rounds"].append({"id": "r1", "round_number": 2})),
+    ("orphan_team", "error", lambda d: d["players"][0].update(team_id="zz")),
+    ("duplicate_player_desk", "error", lambda d: d["players"][1].update(desk_number=1)),
+    ("duplicate_round", "error", lambda d: d["rounds"].append({"id": "r2", "round_number": 1})),
+    ("orphan_round", "error", lambda d: d["pairings"][0].update(round_id="zz")),
+    ("missing_team", "error", lambda d: d["pairings"][1].update(team_a_id=None)),
+    ("self_pairing", "error", lambda d: d["pairings"][0].update(team_b_id="t1")),
+    ("double_booked", "error", lambda d: d["pairings"][1].update(team_a_id="t1")),
+    ("orphan_pairing", "error", lambda d: d["board_results"][0].update(pairing_id="zz")),
+    ("duplicate_desk", "error", lambda d: d["board_results"][1].update(desk_number=1)),
+    ("unknown_result", "error", lambda d: d["board_results"][0].update(result="2-0")),
+    ("orphan_player", "error", lambda d: d["board_results"][0].update(player_a_id="zz")),
+    ("orphan_player", "error", lambda d: d["tournament_results"][0]["player_standings"].append({"player_id": "zz"})),
+    ("wrong_team", "error", lambda d: d["board_results"][0].update(player_a_id="t3-1")),
+    ("bad_score", "error", lambda d: d["pairings"][0].update(team_a_points="one")),
+    ("bye_mismatch", "warning", lambda d: d["pairings"][1].update(is_bye=False)),
+    ("missing_colour", "warning", lambda d: d["board_results"][0].pop("player_a_color")),
+    ("wrong_desk", "warning", lambda d: d["players"][0].update(desk_number=3)),
+    ("board_on_bye", "warning", lambda d: d["board_results"][0].update(pairing_id="p2", player_a_id="t3-1",
+                                                                       player_b_id=None)),
+    ("score_mismatch", "warning", lambda d: d["pairings"][0].update(team_a_points=2)),
+    ("snapshot_mismatch", "warning", lambda d: d["tournament_results"][0]["team_standings"][0].update(
+        points_from_boards=2)),
+]
+
+
+@pytest.mark.parametrize("code, severity, fn", CASES, ids=[c[0] for c in CASES])
+def test_each_code(code, severity, fn):
+    assert (severity, code) in _codes(_mutate(fn))
+
+
+def test_empty_result_is_not_an_error_and_forfeits_count():
+    data = _mutate(lambda d: d["board_results"][1].update(result=""))
+    assert not has_errors(audit(data))
+    data = _mutate(lambda d: d["board_results"][1].update(result="+-"))
+    assert ("warning", "score_mismatch") in _codes(data)
+    assert not has_errors(audit(data))
+
+
+def test_strict_and_check():
+    data = _mutate(lambda d: d["pairings"][0].update(team_a_points=2))
+    issues = audit(data)
+    assert not has_errors(issues) and has_errors(issues, strict=True)
+    assert check(data) == issues
+    with pytest.raises(AuditError):
+        check(data, strict=True)
+
+
+def test_audit_error_survives_pickling():
+    data = _mutate(lambda d: d["rounds"].append({"id": "r2", "round_number": 1}))
+    with pytest.raises(AuditError) as exc:
+        check(data)
+    clone = pickle.loads(pickle.dumps(exc.value))
+    assert clone.issues == exc.value.issues
+    assert "duplicate_round" in str(clone)
+
+
+def test_format_issues_limit():
+    data = _clean()
+    for b in data["board_results"]:
+        b.pop("player_a_color")
+    issues = audit(data)
+    assert len(issues) == 2
+    text = format_issues(issues, limit=1)
+    assert text.splitlines()[0].startswith("[warning] missing_colour board_results#b1")
+    assert text.endswith("... and 1 more")
+
+
+def test_audit_does_not_modify_data():
+    data = _mutate(lambda d: d["teams"].append({"name": "X"}))
+    before = copy.deepcopy(data)
+    audit(data)
+    assert data == before
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from leaderboard import Leaderboard
+
+
+def _row(pid, name, desk, team, points, tb_desk=0.0, tb_black=0.0, **extra):
+    return {"player_id": pid, "full_name": name, "desk_number": desk, "team_id": team,
+            "points": points, "tb_desk": tb_desk, "tb_black": tb_black, **extra}
+
+
+def _rows():
+    return [
+        _row("a", "Ann", 1, "t1", 3.0, 2.0),
+        _row("b", "Bob", 1, "t2", 3.0, 2.5),
+        _row("c", "Cid", 1, "t3", 2.0),
+        _row("d", "Dan", 2, "t1", 1.0, is_staff=True),
+        _row("e", "Eve", 2, "t2", 1.0, is_staff=True),
+    ]
+
+
+def test_top_orders_by_points_then_tiebreaks_then_first_seen():
+    board = Leaderboard(_rows())
+    assert [r["player_id"] for r in board.top("desk", 1, 3)] == ["b", "a", "c"]
+    assert [r["player_id"] for r in board.top("desk", 2, 5)] == ["d", "e"]
+    assert board.top("desk", 1, 0) == []
+    assert board.top("desk", 9, 3) == []
+
+
+def test_matches_a_stable_sort():
+    rows = _rows()
+    board = Leaderboard(rows)
+    for team in ("t1", "t2", "t3"):
+        expected = sorted((r for r in rows if r["team_id"] == team),
+                          key=lambda r: (-r["points"], -r["tb_desk"], -r["tb_black"]))
+        assert board.top("team", team, 10) == expected
+
+
+def test_custom_categories_skip_none_and_false():
+    board = Leaderboard(_rows(), categories={"staff": lambda r: r.get("is_staff", False)})
+    assert [r["player_id"] for r in board.top("staff", True, 5)] == ["d", "e"]
+    assert board.values("staff") == [True]
+    assert sorted(board.values("desk")) == [1, 2]
+
+
+def test_duplicate_player_ids_are_all_kept():
+    rows = _rows() + [_row("a", "Ann", 2, "t1", 0.5)]
+    board = Leaderboard(rows)
+    assert len(board) == 6
+    assert [r["full_name"] for r in board.top("desk", 2, 5)] == ["Dan", "Eve", "Ann"]
+    assert board.get(("dup", "a", 2)) is rows[-1]
+
+
+def test_upsert_replaces_and_moves_between_groups():
+    board = Leaderboard(_rows())
+    board.upsert(_row("c", "Cid", 2, "t3", 4.0))
+    assert len(board) == 5
+    assert [r["player_id"] for r in board.top("desk", 1, 5)] == ["b", "a"]
+    assert [r["player_id"] for r in board.top("desk", 2, 5)] == ["c", "d", "e"]
+    # upsert keeps the first-seen position for ties
+    board.upsert(_row("e", "Eve", 2, "t2", 1.0))
+    assert [r["player_id"] for r in board.top("desk", 2, 5)] == ["c", "d", "e"]
+
+
+def test_remove_and_find():
+    board = Leaderboard(_rows())
+    assert board.find("Ann", 1)["player_id"] == "a"
+    board.remove("a")
+    board.remove("missing")
+    assert board.find("Ann", 1) is None
+    assert board.values("team").count("t1") == 1
+    board.remove("d")
+    assert "t1" not in board.values("team")
+
+
+def test_rows_without_ids_and_with_bad_numbers():
+    board = Leaderboard([
+        {"full_name": "X", "desk_number": 1, "team_id": "t", "points": "n/a"},
+        {"full_name": "Y", "desk_number": 1, "team_id": "t", "points": "1.5"},
+    ])
+    assert [r["full_name"] for r in board.top("desk", 1, 2)] == ["Y", "X"]
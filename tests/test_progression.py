@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from generate_tournament_report import compute_team_match_standings
+from progression import compute_progression, progression_rows
+
+
+def _board(pid, desk, result):
+    return {"id": f"{pid}-{desk}", "pairing_id": pid, "desk_number": desk, "result": result,
+            "player_a_color": "white" if desk % 2 else "black"}
+
+
+def _data():
+    teams = [{"id": t, "name": t.upper()} for t in ("a", "b", "c", "d")]
+    rounds = [{"id": "r1", "round_number": 1}, {"id": "r2", "round_number": 2}, {"id": "r3", "round_number": 3}]
+    pairings = [
+        {"id": "p1", "round_id": "r1", "team_a_id": "a", "team_b_id": "b"},
+        {"id": "p2", "round_id": "r1", "team_a_id": "c", "team_b_id": "d"},
+        {"id": "p3", "round_id": "r2", "team_a_id": "a", "team_b_id": "c"},
+        {"id": "p4", "round_id": "r2", "team_a_id": "b", "team_b_id": "d"},
+        {"id": "p5", "round_id": "r3", "team_a_id": "d", "team_b_id": "a"},
+        {"id": "p6", "round_id": "r3", "team_a_id": "b", "team_b_id": "c"},
+    ]
+    results = {"p1": ("1-0", "1-0"), "p2": ("0-1", "0.5-0.5"), "p3": ("0-1", "0-1"),
+               "p4": ("0.5-0.5", "0.5-0.5"), "p5": ("1-0", "1-0"), "p6": ("1-0", "0-1")}
+    boards = [_board(pid, d, r) for pid, rs in results.items() for d, r in enumerate(rs, start=1)]
+    return {"teams": teams, "rounds": rounds, "pairings": pairings, "board_results": boards,
+            "players": [], "tournament_results": []}
+
+
+def test_last_round_equals_team_standings():
+    data = _data()
+    prog = compute_progression(None, data)
+    final = {r["team_id"]: (rank, r["points"]) for rank, r in
+             enumerate(compute_team_match_standings(None, data), start=1)}
+    assert prog["rounds"] == [1, 2, 3]
+    for t in prog["teams"]:
+        last = t["rounds"][-1]
+        assert (last["rank"], last["points"]) == final[t["team_id"]]
+
+
+def test_points_are_prefix_sums():
+    prog = compute_progression(None, _data())
+    by_team = {t["team_id"]: [r["points"] for r in t["rounds"]] for t in prog["teams"]}
+    assert by_team["a"] == [1.0, 1.0, 1.0]
+    assert by_team["d"] == [1.0, 1.5, 2.5]
+    for t in prog["teams"]:
+        wdl = t["rounds"][-1]
+        assert wdl["wins"] + wdl["draws"] + wdl["losses"] == 3
+
+
+def test_rounds_are_ordered_by_number_not_storage():
+    data = _data()
+    data["rounds"].reverse()
+    assert compute_progression(None, data)["rounds"] == [1, 2, 3]
+
+
+def test_bye_and_orphan_pairings_are_ignored():
+    data = _data()
+    data["pairings"].append({"id": "bye", "round_id": "r1", "team_a_id": "a", "team_b_id": None, "is_bye": True})
+    data["pairings"].append({"id": "lost", "round_id": "nope", "team_a_id": "a", "team_b_id": "b"})
+    assert compute_progression(None, data) == compute_progression(None, _data())
+
+
+def test_empty_tournament():
+    data = _data()
+    data["rounds"] = []
+    prog = compute_progression(None, data)
+    assert prog["rounds"] == []
+    assert all(t["rounds"] == [] for t in prog["teams"])
+
+
+def test_rows_are_long_format_sorted_by_round_and_rank():
+    rows = progression_rows(compute_progression(None, _data()))
+    assert len(rows) == 12
+    assert [(r["round"], r["rank"]) for r in rows] == sorted((r["round"], r["rank"]) for r in rows)
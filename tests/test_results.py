@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from results import DRAW, WIN_A, WIN_B, parse_result, result_points
+
+
+@pytest.mark.parametrize("raw", ["1-0", "1:0", "1–0", " 1 - 0 ", "1—0"])
+def test_win_a(raw):
+    assert parse_result(raw) == WIN_A
+
+
+@pytest.mark.parametrize("raw", ["0-1", "0:1", "0—1", "0 − 1"])
+def test_win_b(raw):
+    assert parse_result(raw) == WIN_B
+
+
+@pytest.mark.parametrize("raw", ["0.5-0.5", "½-½", "½–½", "1/2-1/2", "0,5:0,5", "=", "Draw", "ничья",
+                                 "1/2", "½", " 1/2 "])
+def test_draws(raw):
+    assert parse_result(raw) == DRAW
+
+
+@pytest.mark.parametrize("raw, text, points", [
+    ("+-", "1-0", (1.0, 0.0)), ("+/-", "1-0", (1.0, 0.0)), ("1F-0", "1-0", (1.0, 0.0)),
+    ("-+", "0-1", (0.0, 1.0)), ("- : +", "0-1", (0.0, 1.0)),
+    ("--", "0-0", (0.0, 0.0)), ("0F-0F", "0-0", (0.0, 0.0)),
+])
+def test_forfeits(raw, text, points):
+    res = parse_result(raw)
+    assert res.forfeit and res.text == text and (res.a, res.b) == points
+
+
+@pytest.mark.parametrize("raw", ["", None, "bogus", "2-0", "1-1"])
+def test_unknown_and_empty(raw):
+    assert parse_result(raw) is None
+    assert result_points(raw) == (0.0, 0.0)
+
+
+def test_flipped():
+    assert WIN_A.flipped() == WIN_B
+    assert DRAW.flipped() == DRAW
+    assert parse_result("+-").flipped() == WIN_B._replace(forfeit=True)
+
+
+def test_non_string_input():
+    assert parse_result(0) is None
+    assert result_points("1-0") == (1.0, 0.0)
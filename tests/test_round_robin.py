@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from itertools import combinations
+
+import pytest
+
+from audit import audit, has_errors
+from round_robin import berger_rounds, build_schedule, desk_colours, merge_schedule, rounds_for_teams
+
+
+def test_berger_four_matches_fide_table():
+    # FIDE Berger table for 4 players (1-based): 1-4 2-3 | 4-3 1-2 | 2-4 3-1
+    assert berger_rounds(4) == [[(0, 3), (1, 2)], [(3, 2), (0, 1)], [(1, 3), (2, 0)]]
+
+
+@pytest.mark.parametrize("n", [2, 4, 6, 10, 16])
+def test_berger_every_pair_meets_once(n):
+    rounds = berger_rounds(n)
+    assert len(rounds) == n - 1
+    met = [frozenset(p) for table in rounds for p in table]
+    assert len(met) == len(set(met)) == n * (n - 1) // 2
+    assert set(met) == {frozenset(p) for p in combinations(range(n), 2)}
+    for table in rounds:
+        seeds = [s for p in table for s in p]
+        assert sorted(seeds) == list(range(n))
+
+
+def test_berger_colours_are_balanced():
+    n = 10
+    whites = [0] * n
+    for table in berger_rounds(n):
+        for w, _b in table:
+            whites[w] += 1
+    assert all(abs(w - (n - 1) / 2) <= 1 for w in whites)
+
+
+@pytest.mark.parametrize("teams, rounds", [(0, 0), (1, 0), (2, 1), (3, 3), (4, 3), (9, 9)])
+def test_rounds_for_teams(teams, rounds):
+    assert rounds_for_teams(teams) == rounds
+
+
+def test_desk_colours_alternate_and_tolerate_garbage():
+    assert desk_colours(1) == ("white", "black")
+    assert desk_colours(2) == ("black", "white")
+    assert desk_colours("x") == ("white", "black")
+
+
+def _data(n_teams, desks=2):
+    teams = [{"id": f"t{i}", "name": f"T{i}"} for i in range(n_teams)]
+    players = [{"id": f"p{i}-{d}", "team_id": f"t{i}", "desk_number": d, "full_name": f"P{i}{d}"}
+               for i in range(n_teams) for d in range(1, desks + 1)]
+    return {"teams": teams, "players": players, "rounds": [], "pairings": [], "board_results": []}
+
+
+def test_odd_team_count_gets_one_bye_per_round():
+    data = _data(5)
+    s = build_schedule(data)
+    assert len(s["rounds"]) == 5
+    for r in s["rounds"]:
+        in_round = [p for p in s["pairings"] if p["round_id"] == r["id"]]
+        assert sum(1 for p in in_round if p["is_bye"]) == 1
+        assert all(p["team_b_id"] is None for p in in_round if p["is_bye"])
+    assert not any(b["player_a_id"] is None for b in s["board_results"])
+
+
+def test_merge_is_idempotent_and_passes_audit():
+    data = _data(4)
+    s = build_schedule(data)
+    assert merge_schedule(data, s) == {"rounds": 3, "pairings": 6, "board_results": 12}
+    assert merge_schedule(data, build_schedule(data)) == {"rounds": 0, "pairings": 0, "board_results": 0}
+    assert not has_errors(audit(data))
+
+
+def test_merge_refuses_a_different_schedule():
+    data = _data(4)
+    merge_schedule(data, build_schedule(data))
+    data["teams"].append({"id": "t4", "name": "T4"})
+    with pytest.raises(ValueError, match="--replace"):
+        merge_schedule(data, build_schedule(data))
+    merge_schedule(data, build_schedule(data), replace=True)
+    assert len(data["rounds"]) == 5
+    assert not has_errors(audit(data))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from season import IdentityIndex, clean_name, event_contribution, normalize_name
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Иванов Иван", "иван  ИВАНОВ"),
+    ("Әлібек Нұрлан", "алибек нурлан"),
+    ("Ёлкин Пётр", "елкин петр"),
+    ("Ａｎｎａ", "anna"),
+    ("Anna Smith", "smith anna"),
+])
+def test_normalize_name_equivalences(a, b):
+    assert normalize_name(a) == normalize_name(b)
+
+
+def test_normalize_name_empty_and_clean_name():
+    assert normalize_name(None) == normalize_name("   ") == ""
+    assert clean_name("  Иванов \t Иван ") == "Иванов Иван"
+
+
+def test_identity_overrides():
+    ids = IdentityIndex({
+        "teams": {"КазНУ-2": "КазНУ"},
+        "players": {"Иванов И.": "Иванов Иван", "Петров П. @ Sputnik": "Петров Пётр @ КазНУ"},
+    })
+    assert ids.key("teams", "казну-2") == ids.key("teams", "КазНУ")
+    assert ids.player_key("Иванов И.", "Any") == ids.player_key("Иванов Иван", "Any")
+    assert ids.player_key("Петров П.", "Sputnik") == ids.player_key("Петров Пётр", "КазНУ-2")
+    # the "@ team" alias only applies to that team
+    assert ids.player_key("Петров П.", "Other") != ids.player_key("Петров Пётр", "КазНУ")
+    assert ids.player_key("Иванов Иван", "A") != ids.player_key("Иванов Иван", "B")
+
+
+def _event(results):
+    teams = [{"id": "t1", "name": "Alpha"}, {"id": "t2", "name": "Beta"}]
+    players = [{"id": f"{t}-{d}", "team_id": t, "desk_number": d, "full_name": f"P {t} {d}"}
+               for t in ("t1", "t2") for d in (1, 2)]
+    boards = [{"id": f"b{d}", "pairing_id": "p1", "desk_number": d, "player_a_id": f"t1-{d}",
+               "player_b_id": f"t2-{d}", "player_a_color": "white" if d == 1 else "black", "result": r}
+              for d, r in enumerate(results, start=1)]
+    return {"teams": teams, "players": players,
+            "rounds": [{"id": "r1", "round_number": 1}],
+            "pairings": [{"id": "p1", "round_id": "r1", "team_a_id": "t1", "team_b_id": "t2"}],
+            "board_results": boards, "tournament_results": []}
+
+
+def _player(contrib, ids, pid):
+    team = "Alpha" if pid.startswith("t1") else "Beta"
+    return contrib["players"][ids.player_key(f"P {pid.split('-')[0]} {pid.split('-')[1]}", team)]
+
+
+def test_forfeits_and_garbage_are_not_games():
+    ids = IdentityIndex()
+    contrib = event_contribution(_event(["+-", "???"]), ids)
+    assert contrib["games"] == []
+    for pid in ("t1-1", "t1-2", "t2-1", "t2-2"):
+        row = _player(contrib, ids, pid)
+        assert (row["games"], row["wins"], row["draws"], row["losses"]) == (0, 0, 0, 0)
+
+
+def test_played_games_count():
+    ids = IdentityIndex()
+    data = _event(["1-0", "½-½"])
+    data["board_results"][1]["forfeit"] = False
+    contrib = event_contribution(data, ids)
+    assert len(contrib["games"]) == 2
+    a1, b2 = _player(contrib, ids, "t1-1"), _player(contrib, ids, "t2-2")
+    assert (a1["games"], a1["wins"], a1["points"]) == (1, 1, 1.0)
+    assert (b2["games"], b2["draws"], b2["points"]) == (1, 1, 0.5)
+    data["board_results"][0]["forfeit"] = True
+    assert len(event_contribution(data, ids)["games"]) == 1
+
+
+def test_same_named_teams_are_split():
+    data = _event(["1-0", "0-1"])
+    data["teams"][1]["name"] = " alpha "
+    data["teams"][1]["short_code"] = "A2"
+    contrib = event_contribution(data, IdentityIndex())
+    assert len(contrib["teams"]) == 2
+    assert len(contrib["players"]) == 4
+    assert contrib["collisions"] == ["Alpha: 2 teams, split by code"]
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from standings_server import etag_matches
+
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize("header", [
+    '"abc123"', "*", ' "abc123" ', 'W/"abc123"', '"old", "abc123"', '"old",W/"abc123"', '"old", *',
+])
+def test_matches(header):
+    assert etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", [None, "", '"old"', "abc123", '"abc1234"', 'W/"old", "new"'])
+def test_does_not_match(header):
+    assert not etag_matches(header, ETAG)